@@ -36,7 +36,14 @@ class Settings:
     
     # OCR Settings
     OCR_LANGUAGES: List[str] = ["eng", "fra", "deu", "spa", "ita"]
-    OCR_DPI: int = int(os.getenv("OCR_DPI", "300"))
+    OCR_DPI: int = int(os.getenv("OCR_DPI", "200"))
+    # Pages are first OCR'd at OCR_FAST_DPI and re-rendered at OCR_DPI only below the confidence gate; 0 disables
+    OCR_FAST_DPI: int = int(os.getenv("OCR_FAST_DPI", "150"))
+    OCR_FAST_PASS_CONFIDENCE: float = float(os.getenv("OCR_FAST_PASS_CONFIDENCE", "0.85"))
+    OCR_CONCURRENCY: int = int(os.getenv("OCR_CONCURRENCY", str(os.cpu_count() or 1)))
+    OCR_CACHE_TTL: int = int(os.getenv("OCR_CACHE_TTL", str(30 * 24 * 3600)))  # 0 disables the Redis OCR cache
+    # Worker processes for page OCR; 0 keeps OCR in threads (required under Celery's daemonic prefork workers)
+    OCR_PROCESS_WORKERS: int = int(os.getenv("OCR_PROCESS_WORKERS", "0"))
     
     # CORS Settings
     CORS_ORIGINS: List[str] = [
@@ -61,6 +68,11 @@ class Settings:
 # Global settings instance
 settings = Settings()
 
+# Set once per process, before any tesseract runs: parallel OCR pages already use the cores,
+# so stop each tesseract process spawning its own OpenMP threads
+if settings.OCR_CONCURRENCY > 1:
+    os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+
 def get_settings() -> Settings:
     """Get application settings instance"""
     return settings
@@ -1,8 +1,4 @@
-# Use OpenCV compatibility layer
-try:
-    from app.utils.cv2_compat import cv2
-except ImportError:
-    cv2 = None
+from app.utils.cv2_compat import cv2
 
 import numpy as np
 import logging
@@ -14,6 +10,16 @@ import re
 
 logger = logging.getLogger(__name__)
 
+_TESSERACT_WHITELIST = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz .,;:!?()-'
+
+# (page segmentation mode, tesseract variables) tried in order by the advanced Tesseract pass
+_TESSERACT_PSM_CONFIGS: Tuple[Tuple[int, Dict[str, str]], ...] = (
+    (6, {'tessedit_char_whitelist': _TESSERACT_WHITELIST}),  # Uniform text block
+    (4, {'tessedit_char_whitelist': _TESSERACT_WHITELIST}),  # Single text column
+    (3, {'tessedit_char_whitelist': _TESSERACT_WHITELIST}),  # Fully automatic
+    (1, {'preserve_interword_spaces': '1'}),  # Automatic with OSD
+)
+
 class AdvancedOCRService:
     """
     Advanced OCR service with multiple engines and enhanced preprocessing
@@ -140,35 +146,34 @@ class AdvancedOCRService:
             logger.warning(f"Image enhancement failed: {e}")
             return image
     
-    def extract_text_tesseract_advanced(self, image: Image.Image) -> Dict[str, Any]:
+    def extract_text_tesseract_advanced(self, image: Image.Image, language: str = 'eng') -> Dict[str, Any]:
         """
         Advanced Tesseract OCR with optimized settings for accuracy
+        
+        language is passed straight to Tesseract, so no script or language detection runs.
         """
         try:
             # Enhanced preprocessing
             enhanced_image = self.enhance_image_for_ocr(image, aggressive=True)
             
             # Multiple PSM (Page Segmentation Mode) attempts for best results
-            psm_configs = [
-                '--psm 6 -c tessedit_char_whitelist=0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz .,;:!?()-',  # Uniform text block
-                '--psm 4 -c tessedit_char_whitelist=0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz .,;:!?()-',  # Single text column
-                '--psm 3 -c tessedit_char_whitelist=0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz .,;:!?()-',  # Fully automatic
-                '--psm 1 -c preserve_interword_spaces=1',  # Automatic with OSD
-            ]
-            
             best_result = {'text': '', 'confidence': 0, 'words': []}
             
-            for config in psm_configs:
+            for psm, variables in _TESSERACT_PSM_CONFIGS:
+                config = '--oem 1 --psm {} {}'.format(
+                    psm, ' '.join(f'-c {name}={value}' for name, value in variables.items())
+                )
                 try:
                     # Get detailed OCR data
                     ocr_data = pytesseract.image_to_data(
                         enhanced_image, 
+                        lang=language,
                         output_type=pytesseract.Output.DICT,
                         config=config
                     )
                     
-                    # Extract text
-                    text = pytesseract.image_to_string(enhanced_image, config=config)
+                    # Rebuild text from the same run instead of spawning tesseract again
+                    text = self._text_from_ocr_data(ocr_data)
                     
                     # Calculate confidence
                     confidence = self._calculate_confidence(ocr_data)
@@ -779,11 +784,45 @@ class AdvancedOCRService:
     def _calculate_confidence(self, ocr_data: Dict) -> float:
         """Calculate confidence from OCR data"""
         try:
-            confidences = [int(conf) for conf in ocr_data['conf'] if int(conf) > 0]
-            return sum(confidences) / len(confidences) / 100.0 if confidences else 0.0
+            # Vectorized mean of the positive word confidences (-1 marks non-word boxes)
+            confidences = np.asarray(ocr_data['conf'], dtype=np.float64).astype(np.int64)
+            positive = confidences[confidences > 0]
+            return float(positive.mean()) / 100.0 if positive.size else 0.0
         except Exception:
             return 0.0
     
+    def _text_from_ocr_data(self, ocr_data: Dict) -> str:
+        """Reassemble plain text from image_to_data output, one line per OCR line and blank lines between blocks"""
+        blocks = []
+        lines = []
+        words = []
+        current_line = None
+        current_block = None
+        
+        for i, word in enumerate(ocr_data['text']):
+            if not word.strip():
+                continue
+            block_key = (ocr_data['page_num'][i], ocr_data['block_num'][i], ocr_data['par_num'][i])
+            line_key = block_key + (ocr_data['line_num'][i],)
+            
+            if line_key != current_line:
+                if words:
+                    lines.append(' '.join(words))
+                    words = []
+                if block_key != current_block and lines:
+                    blocks.append('\n'.join(lines))
+                    lines = []
+                current_line = line_key
+                current_block = block_key
+            words.append(word)
+        
+        if words:
+            lines.append(' '.join(words))
+        if lines:
+            blocks.append('\n'.join(lines))
+        
+        return '\n\n'.join(blocks)
+    
     def _extract_word_data(self, ocr_data: Dict) -> List[Dict]:
         """Extract word-level data from OCR results"""
         words = []
@@ -803,7 +842,7 @@ class AdvancedOCRService:
         
         return words
     
-    def extract_text_multi_engine(self, image: Image.Image) -> Dict[str, Any]:
+    def extract_text_multi_engine(self, image: Image.Image, language: str = 'eng') -> Dict[str, Any]:
         """
         Use multiple OCR engines and combine results for maximum accuracy
         """
@@ -811,7 +850,7 @@ class AdvancedOCRService:
         
         # Try all available engines
         if self.engines.get('tesseract', False):
-            results.append(self.extract_text_tesseract_advanced(image))
+            results.append(self.extract_text_tesseract_advanced(image, language))
         
         if self.engines.get('easyocr', False):
             results.append(self.extract_text_easyocr(image))
@@ -19,15 +19,21 @@ Usage:
 import json
 import logging
 import hashlib
+from collections import OrderedDict
 from datetime import datetime
 from typing import Dict, List, Optional, Any, Union
 from dataclasses import dataclass
 from enum import Enum
+from types import MappingProxyType
 
 from .prompts import DocumentPrompts, SpecializedPrompts
+from .prompt_config import MONITORING_CONFIG
 
 logger = logging.getLogger(__name__)
 
+# Input validation only feeds debug logging, so it runs only when prompt logging is enabled
+_VALIDATE_PROMPT_INPUT = MONITORING_CONFIG["logging"].get("log_prompts", False)
+
 class PromptStrategy(Enum):
     """Prompt strategy types for different use cases"""
     ACCURACY_FOCUSED = "accuracy"
@@ -47,28 +53,51 @@ class PromptPerformance:
     usage_count: int
     last_updated: datetime
 
+# Language-specific prompt variations; DocumentPrompts holds no per-use state, so they are shared
+_LANGUAGE_PROMPTS = MappingProxyType({
+    language: DocumentPrompts(language) for language in ('en', 'es', 'fr', 'de', 'it', 'pt')
+})
+
+# Optimized prompts kept per manager; repeat requests for the same text skip rebuilding.
+# Bounded by entry count and by the total characters of the cached prompts.
+_PROMPT_CACHE_SIZE = 64
+_PROMPT_CACHE_MAX_CHARS = 4 * 1024 * 1024
+
+# Shared managers handed out by AdvancedPromptManager.for_strategy
+_MANAGERS_BY_STRATEGY: Dict[PromptStrategy, "AdvancedPromptManager"] = {}
+
 class AdvancedPromptManager:
     """
     Advanced prompt management with optimization and testing capabilities
     """
     
     def __init__(self, strategy: PromptStrategy = PromptStrategy.ACCURACY_FOCUSED):
-        self.base_prompts = DocumentPrompts()
+        self.base_prompts = _LANGUAGE_PROMPTS['en']
         self.specialized_prompts = SpecializedPrompts()
         self.strategy = strategy
         self.performance_data: Dict[str, PromptPerformance] = {}
         self.custom_templates: Dict[str, Any] = {}
         self.prompt_chains: Dict[str, Any] = {}
+        self.language_prompts = _LANGUAGE_PROMPTS
+        # LRU cache of built prompts, keyed by (strategy, prompt_type, document_type, text digest)
+        self._prompt_cache: "OrderedDict[tuple, str]" = OrderedDict()
+        self._prompt_cache_chars = 0
+    
+    def set_strategy(self, strategy: PromptStrategy):
+        """Switch the prompt strategy, reusing this manager instead of building another"""
+        self.strategy = strategy
+    
+    @classmethod
+    def for_strategy(cls, strategy: PromptStrategy = PromptStrategy.ACCURACY_FOCUSED) -> "AdvancedPromptManager":
+        """
+        Get a shared manager for strategy, created on first use
         
-        # Language-specific prompt variations
-        self.language_prompts = {
-            'en': DocumentPrompts('en'),
-            'es': DocumentPrompts('es'), 
-            'fr': DocumentPrompts('fr'),
-            'de': DocumentPrompts('de'),
-            'it': DocumentPrompts('it'),
-            'pt': DocumentPrompts('pt')
-        }
+        Shared managers also share their performance data, custom templates and chains.
+        """
+        manager = _MANAGERS_BY_STRATEGY.get(strategy)
+        if manager is None:
+            manager = _MANAGERS_BY_STRATEGY.setdefault(strategy, cls(strategy=strategy))
+        return manager
     
     # =============================================================================
     # DYNAMIC PROMPT GENERATION
@@ -84,29 +113,63 @@ class AdvancedPromptManager:
         """
         try:
             # Validate input
-            validation = self.base_prompts.validate_prompt_input(prompt_type, text)
-            if not validation["valid"]:
-                logger.warning(f"Invalid prompt input: {validation['errors']}")
-            
-            # Select appropriate prompt template based on document type
-            if document_type and hasattr(self.specialized_prompts, f"get_{document_type}_analysis_prompt"):
-                method = getattr(self.specialized_prompts, f"get_{document_type}_analysis_prompt")
-                return method(text)
-            
-            # Apply strategy-based optimizations
-            if self.strategy == PromptStrategy.SPEED_OPTIMIZED:
-                return self._get_speed_optimized_prompt(prompt_type, text)
-            elif self.strategy == PromptStrategy.DETAIL_ORIENTED:
-                return self._get_detailed_prompt(prompt_type, text)
-            elif self.strategy == PromptStrategy.CONSERVATIVE:
-                return self._get_conservative_prompt(prompt_type, text)
-            else:
-                return self._get_standard_prompt(prompt_type, text, context)
+            if _VALIDATE_PROMPT_INPUT:
+                validation = self.base_prompts.validate_prompt_input(prompt_type, text)
+                if not validation["valid"]:
+                    logger.warning(f"Invalid prompt input: {validation['errors']}")
+            
+            # Prompts depend only on these; the text is keyed by digest so the cache never
+            # holds whole documents and hits do not compare them character by character
+            cache_key = None
+            if context is None:
+                text_digest = hashlib.blake2b(text.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+                cache_key = (self.strategy, prompt_type, document_type, text_digest)
+            if cache_key is not None:
+                cached = self._prompt_cache.get(cache_key)
+                if cached is not None:
+                    self._prompt_cache.move_to_end(cache_key)
+                    return cached
+            
+            prompt = self._build_optimized_prompt(prompt_type, text, document_type, context)
+            
+            if cache_key is not None and _PROMPT_CACHE_SIZE > 0 and len(prompt) <= _PROMPT_CACHE_MAX_CHARS:
+                previous = self._prompt_cache.pop(cache_key, None)
+                if previous is not None:
+                    self._prompt_cache_chars -= len(previous)
+                self._prompt_cache[cache_key] = prompt
+                self._prompt_cache_chars += len(prompt)
+                while (len(self._prompt_cache) > _PROMPT_CACHE_SIZE
+                       or self._prompt_cache_chars > _PROMPT_CACHE_MAX_CHARS):
+                    _, evicted = self._prompt_cache.popitem(last=False)
+                    self._prompt_cache_chars -= len(evicted)
+            
+            return prompt
                 
         except Exception as e:
             logger.error(f"Error generating optimized prompt: {str(e)}")
             return self._get_fallback_prompt(prompt_type, text)
     
+    def _build_optimized_prompt(self, 
+                                prompt_type: str, 
+                                text: str, 
+                                document_type: Optional[str],
+                                context: Optional[Dict[str, Any]]) -> str:
+        # Select appropriate prompt template based on document type
+        if document_type:
+            specialized_prompt = self.specialized_prompts.get_analysis_prompt(document_type, text)
+            if specialized_prompt is not None:
+                return specialized_prompt
+        
+        # Apply strategy-based optimizations
+        if self.strategy == PromptStrategy.SPEED_OPTIMIZED:
+            return self._get_speed_optimized_prompt(prompt_type, text)
+        elif self.strategy == PromptStrategy.DETAIL_ORIENTED:
+            return self._get_detailed_prompt(prompt_type, text)
+        elif self.strategy == PromptStrategy.CONSERVATIVE:
+            return self._get_conservative_prompt(prompt_type, text)
+        else:
+            return self._get_standard_prompt(prompt_type, text, context)
+    
     def get_multi_language_prompt(self, 
                                 prompt_type: str, 
                                 text: str, 
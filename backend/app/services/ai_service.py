@@ -128,7 +128,7 @@ class AIService:
         try:
             # Truncate text for classification
             max_length = 512
-            truncated_text = text[:max_length] if len(text) > max_length else text
+            truncated_text = text[:max_length]
             
             # Simple rule-based classification for now
             document_types = {
@@ -323,7 +323,7 @@ class AIService:
         """Detect the language of the text"""
         try:
             # Use first 1000 characters for language detection
-            sample_text = text[:1000] if len(text) > 1000 else text
+            sample_text = text[:1000]
             language = detect(sample_text)
             return language
         except Exception as e:
@@ -1,17 +1,69 @@
+import asyncio
+import functools
 import io
+import itertools
 import logging
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List, Tuple
+from xml.sax.saxutils import escape
 from docx import Document
 from docx.shared import Inches, Pt
 from docx.enum.text import WD_ALIGN_PARAGRAPH
+from docx.oxml import parse_xml
+from docx.oxml.ns import nsdecls
 import datetime
 
 logger = logging.getLogger(__name__)
 
+# WordML templates for the key/value header blocks
+_PARAGRAPH_XML = '<w:p %s>{runs}</w:p>' % nsdecls('w')
+_RUN_XML = '<w:r>{props}{content}</w:r>'
+_BOLD_PROPS_XML = '<w:rPr><w:b/></w:rPr>'
+_TEXT_XML = '<w:t xml:space="preserve">{text}</w:t>'
+_BREAK_XML = '<w:br/>'
+
+# Texts above this size bypass the formatting cache to bound its memory use
+_FORMAT_CACHE_MAX_CHARS = 1_000_000
+
 class DocumentGenerator:
     """Service for generating documents from processed results"""
     
+    @staticmethod
+    def _render_run_xml(text: str, bold: bool = False) -> str:
+        """
+        Render a single WordML run, mapping newlines to line breaks like Run.text does
+        """
+        content = _BREAK_XML.join(
+            _TEXT_XML.format(text=escape(segment)) if segment else ''
+            for segment in text.split('\n')
+        )
+        return _RUN_XML.format(props=_BOLD_PROPS_XML if bold else '', content=content)
+    
+    @staticmethod
+    def _append_runs_paragraph(doc, runs: List[Tuple[str, bool]]) -> None:
+        """
+        Append a paragraph built directly from WordML instead of Paragraph/Run wrappers
+        """
+        rendered = _PARAGRAPH_XML.format(
+            runs=''.join(DocumentGenerator._render_run_xml(text, bold) for text, bold in runs)
+        )
+        # _insert_p keeps the paragraph ahead of the trailing w:sectPr
+        doc.element.body._insert_p(parse_xml(rendered))
+    
+    @staticmethod
+    async def create_docx_async(result: Dict[str, Any]) -> io.BytesIO:
+        """
+        Create a DOCX document in a worker thread so the event loop stays responsive
+        """
+        return await asyncio.to_thread(DocumentGenerator.create_docx_from_results, result)
+    
+    @staticmethod
+    async def create_text_async(result: Dict[str, Any]) -> str:
+        """
+        Create a plain text document in a worker thread so the event loop stays responsive
+        """
+        return await asyncio.to_thread(DocumentGenerator.create_text_from_results, result)
+    
     @staticmethod
     def create_docx_from_results(result: Dict[str, Any]) -> io.BytesIO:
         """
@@ -26,94 +78,107 @@ class DocumentGenerator:
             title.alignment = WD_ALIGN_PARAGRAPH.CENTER
             
             # Add metadata section
-            metadata_para = doc.add_paragraph()
-            metadata_para.add_run('Processing Summary\n').bold = True
-            metadata_para.add_run(f"Filename: {result.get('filename', 'Unknown')}\n")
-            metadata_para.add_run(f"File Type: {result.get('file_type', 'Unknown')}\n")
-            metadata_para.add_run(f"Processing Date: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            metadata_para.add_run(f"Processing Time: {result.get('processing_time', 0):.2f} seconds\n")
-            metadata_para.add_run(f"Text Confidence: {(result.get('text_confidence', 0) * 100):.1f}%\n")
+            metadata_runs = [
+                ('Processing Summary\n', True),
+                (f"Filename: {result.get('filename', 'Unknown')}\n", False),
+                (f"File Type: {result.get('file_type', 'Unknown')}\n", False),
+                (f"Processing Date: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n", False),
+                (f"Processing Time: {result.get('processing_time', 0):.2f} seconds\n", False),
+                (f"Text Confidence: {(result.get('text_confidence', 0) * 100):.1f}%\n", False),
+            ]
+            
+            page_count = result.get('page_count')
+            if page_count:
+                metadata_runs.append((f"Pages: {page_count}\n", False))
             
-            if result.get('page_count'):
-                metadata_para.add_run(f"Pages: {result.get('page_count')}\n")
+            stats = result.get('text_statistics')
+            if stats:
+                metadata_runs.append((f"Word Count: {stats.get('word_count', 0)}\n", False))
+                metadata_runs.append((f"Character Count: {stats.get('character_count', 0)}\n", False))
             
-            if result.get('text_statistics'):
-                stats = result['text_statistics']
-                metadata_para.add_run(f"Word Count: {stats.get('word_count', 0)}\n")
-                metadata_para.add_run(f"Character Count: {stats.get('character_count', 0)}\n")
+            DocumentGenerator._append_runs_paragraph(doc, metadata_runs)
             
             # Add separator
             doc.add_paragraph('─' * 50)
             
             # Add AI Analysis if available
-            if result.get('document_classification'):
+            classification = result.get('document_classification')
+            if classification:
                 doc.add_heading('Document Classification', level=1)
-                classification = result['document_classification']
-                class_para = doc.add_paragraph()
-                class_para.add_run('Type: ').bold = True
-                class_para.add_run(f"{classification.get('type', 'Unknown').title()}\n")
-                class_para.add_run('Confidence: ').bold = True
-                class_para.add_run(f"{(classification.get('confidence', 0) * 100):.1f}%\n")
+                DocumentGenerator._append_runs_paragraph(doc, [
+                    ('Type: ', True),
+                    (f"{classification.get('type', 'Unknown').title()}\n", False),
+                    ('Confidence: ', True),
+                    (f"{(classification.get('confidence', 0) * 100):.1f}%\n", False),
+                ])
             
             # Add entities if available
-            if result.get('entities') and len(result['entities']) > 0:
+            entities = result.get('entities')
+            if entities:
                 doc.add_heading('Extracted Entities', level=1)
                 entities_para = doc.add_paragraph()
                 
-                for entity in result['entities'][:20]:  # Limit to top 20
+                for entity in itertools.islice(entities, 20):  # Limit to top 20
                     entities_para.add_run(f"• {entity.get('text', '')}").bold = True
                     entities_para.add_run(f" ({entity.get('label', 'Unknown')}) ")
                     entities_para.add_run(f"[{(entity.get('confidence', 0) * 100):.1f}%]\n")
             
             # Add sentiment analysis
-            if result.get('sentiment_analysis'):
+            sentiment = result.get('sentiment_analysis')
+            if sentiment:
                 doc.add_heading('Sentiment Analysis', level=1)
-                sentiment = result['sentiment_analysis']
-                sentiment_para = doc.add_paragraph()
-                sentiment_para.add_run('Overall Sentiment: ').bold = True
-                sentiment_para.add_run(f"{sentiment.get('overall_sentiment', 'neutral').title()}\n")
-                sentiment_para.add_run('Confidence: ').bold = True
-                sentiment_para.add_run(f"{(sentiment.get('confidence', 0) * 100):.1f}%\n")
+                sentiment_runs = [
+                    ('Overall Sentiment: ', True),
+                    (f"{sentiment.get('overall_sentiment', 'neutral').title()}\n", False),
+                    ('Confidence: ', True),
+                    (f"{(sentiment.get('confidence', 0) * 100):.1f}%\n", False),
+                ]
                 
-                if sentiment.get('polarity') is not None:
-                    sentiment_para.add_run('Polarity: ').bold = True
-                    sentiment_para.add_run(f"{sentiment.get('polarity', 0):.2f}\n")
+                polarity = sentiment.get('polarity')
+                if polarity is not None:
+                    sentiment_runs.append(('Polarity: ', True))
+                    sentiment_runs.append((f"{polarity:.2f}\n", False))
                 
-                if sentiment.get('subjectivity') is not None:
-                    sentiment_para.add_run('Subjectivity: ').bold = True
-                    sentiment_para.add_run(f"{sentiment.get('subjectivity', 0):.2f}\n")
+                subjectivity = sentiment.get('subjectivity')
+                if subjectivity is not None:
+                    sentiment_runs.append(('Subjectivity: ', True))
+                    sentiment_runs.append((f"{subjectivity:.2f}\n", False))
+                
+                DocumentGenerator._append_runs_paragraph(doc, sentiment_runs)
             
             # Add key information
-            if result.get('key_information'):
+            key_info = result.get('key_information')
+            if key_info:
                 doc.add_heading('Key Information', level=1)
-                key_info = result['key_information']
                 
                 for info_type, values in key_info.items():
-                    if values and len(values) > 0:
+                    if values:
                         info_para = doc.add_paragraph()
                         info_para.add_run(f"{info_type.replace('_', ' ').title()}:\n").bold = True
-                        for value in values[:10]:  # Limit to 10 items per type
+                        for value in itertools.islice(values, 10):  # Limit to 10 items per type
                             info_para.add_run(f"  • {value}\n")
             
             # Add summary
-            if result.get('summary'):
+            summary = result.get('summary')
+            if summary:
                 doc.add_heading('Summary', level=1)
-                summary_para = doc.add_paragraph(result['summary'])
-                summary_para.style.font.size = Pt(11)
+                # Body paragraphs share the Normal style, so size it once
+                doc.styles['Normal'].font.size = Pt(11)
+                doc.add_paragraph(summary)
             
             # Add extracted text
-            if result.get('extracted_text'):
+            text_content = result.get('extracted_text')
+            if text_content:
                 doc.add_page_break()
                 doc.add_heading('Extracted Text', level=1)
                 
                 # Split text into paragraphs
-                text_content = result['extracted_text']
                 paragraphs = text_content.split('\n\n')
                 
+                doc.styles['Normal'].font.size = Pt(10)
                 for para_text in paragraphs:
                     if para_text.strip():
-                        text_para = doc.add_paragraph(para_text.strip())
-                        text_para.style.font.size = Pt(10)
+                        doc.add_paragraph(para_text.strip())
             
             # Save to BytesIO
             doc_buffer = io.BytesIO()
@@ -155,11 +220,12 @@ class DocumentGenerator:
             lines.append(f"Processing Time: {result.get('processing_time', 0):.2f} seconds")
             lines.append(f"Text Confidence: {(result.get('text_confidence', 0) * 100):.1f}%")
             
-            if result.get('page_count'):
-                lines.append(f"Pages: {result.get('page_count')}")
+            page_count = result.get('page_count')
+            if page_count:
+                lines.append(f"Pages: {page_count}")
             
-            if result.get('text_statistics'):
-                stats = result['text_statistics']
+            stats = result.get('text_statistics')
+            if stats:
                 lines.append(f"Word Count: {stats.get('word_count', 0)}")
                 lines.append(f"Character Count: {stats.get('character_count', 0)}")
             
@@ -168,58 +234,63 @@ class DocumentGenerator:
             lines.append("")
             
             # Add AI Analysis
-            if result.get('document_classification'):
+            classification = result.get('document_classification')
+            if classification:
                 lines.append("DOCUMENT CLASSIFICATION:")
-                classification = result['document_classification']
                 lines.append(f"Type: {classification.get('type', 'Unknown').title()}")
                 lines.append(f"Confidence: {(classification.get('confidence', 0) * 100):.1f}%")
                 lines.append("")
             
             # Add entities
-            if result.get('entities') and len(result['entities']) > 0:
+            entities = result.get('entities')
+            if entities:
                 lines.append("EXTRACTED ENTITIES:")
-                for entity in result['entities'][:20]:
+                for entity in itertools.islice(entities, 20):
                     lines.append(f"• {entity.get('text', '')} ({entity.get('label', 'Unknown')}) [{(entity.get('confidence', 0) * 100):.1f}%]")
                 lines.append("")
             
             # Add sentiment
-            if result.get('sentiment_analysis'):
+            sentiment = result.get('sentiment_analysis')
+            if sentiment:
                 lines.append("SENTIMENT ANALYSIS:")
-                sentiment = result['sentiment_analysis']
                 lines.append(f"Overall Sentiment: {sentiment.get('overall_sentiment', 'neutral').title()}")
                 lines.append(f"Confidence: {(sentiment.get('confidence', 0) * 100):.1f}%")
-                if sentiment.get('polarity') is not None:
-                    lines.append(f"Polarity: {sentiment.get('polarity', 0):.2f}")
-                if sentiment.get('subjectivity') is not None:
-                    lines.append(f"Subjectivity: {sentiment.get('subjectivity', 0):.2f}")
+                polarity = sentiment.get('polarity')
+                if polarity is not None:
+                    lines.append(f"Polarity: {polarity:.2f}")
+                subjectivity = sentiment.get('subjectivity')
+                if subjectivity is not None:
+                    lines.append(f"Subjectivity: {subjectivity:.2f}")
                 lines.append("")
             
             # Add key information
-            if result.get('key_information'):
+            key_info = result.get('key_information')
+            if key_info:
                 lines.append("KEY INFORMATION:")
-                key_info = result['key_information']
                 for info_type, values in key_info.items():
-                    if values and len(values) > 0:
+                    if values:
                         lines.append(f"{info_type.replace('_', ' ').title()}:")
-                        for value in values[:10]:
+                        for value in itertools.islice(values, 10):
                             lines.append(f"  • {value}")
                         lines.append("")
             
             # Add summary
-            if result.get('summary'):
+            summary = result.get('summary')
+            if summary:
                 lines.append("SUMMARY:")
-                lines.append(result['summary'])
+                lines.append(summary)
                 lines.append("")
             
             # Add extracted text
-            if result.get('extracted_text'):
+            extracted_text = result.get('extracted_text')
+            if extracted_text:
                 lines.append("=" * 50)
                 lines.append("EXTRACTED TEXT:")
                 lines.append("=" * 50)
                 lines.append("")
                 
                 # Clean and format the extracted text for better readability
-                formatted_text = DocumentGenerator._format_extracted_text(result['extracted_text'])
+                formatted_text = DocumentGenerator._format_extracted_text(extracted_text)
                 lines.append(formatted_text)
             
             return '\n'.join(lines)
@@ -231,13 +302,23 @@ class DocumentGenerator:
     @staticmethod
     def _format_extracted_text(extracted_text: str) -> str:
         """
-        Format extracted text for better readability by cleaning up OCR artifacts
+        Format extracted text, reusing recent results when the same text is rendered again
         """
-        import re
-        
         if not extracted_text:
             return ""
         
+        if len(extracted_text) > _FORMAT_CACHE_MAX_CHARS:
+            return DocumentGenerator._format_extracted_text_uncached(extracted_text)
+        
+        return _format_extracted_text_cached(extracted_text)
+    
+    @staticmethod
+    def _format_extracted_text_uncached(extracted_text: str) -> str:
+        """
+        Format extracted text for better readability by cleaning up OCR artifacts
+        """
+        import re
+        
         # Clean up the text
         formatted_text = extracted_text
         
@@ -291,3 +372,9 @@ class DocumentGenerator:
         formatted_text = formatted_text.strip()
         
         return formatted_text
+
+
+@functools.lru_cache(maxsize=32)
+def _format_extracted_text_cached(extracted_text: str) -> str:
+    """Cached wrapper so repeated text renders of the same result skip the regex pass"""
+    return DocumentGenerator._format_extracted_text_uncached(extracted_text)
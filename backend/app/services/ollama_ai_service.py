@@ -1,16 +1,228 @@
 import asyncio
+import functools
+import hashlib
 import logging
 import re
-import json
 import os
+from collections import OrderedDict
 from typing import Dict, Any, List, Optional
+import ahocorasick
 import httpx
-from textblob import TextBlob
+import orjson
 from langdetect import detect
-from .prompts import DocumentPrompts
+from .prompts import DocumentPrompts, PromptType
 
 logger = logging.getLogger(__name__)
 
+# Keywords for the rule-based classification fallback
+_DOCUMENT_TYPE_KEYWORDS = {
+    'invoice': ('invoice', 'bill', 'payment', 'amount', 'total', 'due'),
+    'contract': ('agreement', 'contract', 'terms', 'conditions', 'party'),
+    'report': ('report', 'analysis', 'conclusion', 'findings', 'summary'),
+    'letter': ('dear', 'sincerely', 'regards', 'letter'),
+    'resume': ('experience', 'education', 'skills', 'work', 'cv'),
+    'legal': ('law', 'legal', 'court', 'jurisdiction', 'whereas'),
+    'academic': ('abstract', 'introduction', 'methodology', 'references'),
+    'technical': ('technical', 'specification', 'implementation', 'system')
+}
+# Flat (keyword, doc_type, weight) table; each keyword contributes 1/len(keywords) to its type's score
+_KEYWORD_WEIGHTS = tuple(
+    (keyword, doc_type, 1.0 / len(keywords))
+    for doc_type, keywords in _DOCUMENT_TYPE_KEYWORDS.items()
+    for keyword in keywords
+)
+
+
+def _build_keyword_automaton():
+    """Build an Aho-Corasick automaton over all classification keywords"""
+    automaton = ahocorasick.Automaton()
+    for keyword_id, (keyword, doc_type, weight) in enumerate(_KEYWORD_WEIGHTS):
+        automaton.add_word(keyword, (keyword_id, doc_type, weight))
+    automaton.make_automaton()
+    return automaton
+
+
+_KEYWORD_AUTOMATON = _build_keyword_automaton()
+
+# Sentiment lexicons for the rule-based fallback
+_POSITIVE_WORDS = (
+    'good', 'great', 'excellent', 'outstanding', 'positive', 'success', 'successful',
+    'benefit', 'beneficial', 'improve', 'improved', 'improvement', 'growth', 'profit',
+    'profitable', 'happy', 'pleased', 'satisfied', 'satisfaction', 'thank', 'thanks',
+    'appreciate', 'excited', 'strong', 'effective', 'efficient', 'approved', 'favorable',
+    'recommend', 'best', 'achieve', 'achieved', 'opportunity', 'gain', 'gains', 'love',
+)
+_NEGATIVE_WORDS = (
+    'bad', 'poor', 'terrible', 'awful', 'negative', 'failure', 'failed', 'fail',
+    'loss', 'losses', 'decline', 'declined', 'decrease', 'risk', 'risks', 'problem',
+    'problems', 'issue', 'issues', 'concern', 'concerns', 'complaint', 'unhappy',
+    'dissatisfied', 'disappointed', 'weak', 'delay', 'delayed', 'overdue', 'penalty',
+    'breach', 'dispute', 'error', 'errors', 'damage', 'damages', 'worst', 'hate',
+)
+_POSITIVE_RE = re.compile(r'\b(?:' + '|'.join(_POSITIVE_WORDS) + r')\b', re.IGNORECASE)
+_NEGATIVE_RE = re.compile(r'\b(?:' + '|'.join(_NEGATIVE_WORDS) + r')\b', re.IGNORECASE)
+
+# Script ranges and stopwords for the fast language guess; langdetect handles the rest
+_SCRIPT_PATTERNS = (
+    ('ko', re.compile(r'[\uac00-\ud7af\u1100-\u11ff]')),
+    ('ru', re.compile(r'[\u0400-\u04ff]')),
+    ('ar', re.compile(r'[\u0600-\u06ff]')),
+    ('he', re.compile(r'[\u0590-\u05ff]')),
+    ('el', re.compile(r'[\u0370-\u03ff]')),
+    ('hi', re.compile(r'[\u0900-\u097f]')),
+    ('th', re.compile(r'[\u0e00-\u0e7f]')),
+)
+_KANA_RE = re.compile(r'[\u3040-\u30ff]')
+_HAN_RE = re.compile(r'[\u4e00-\u9fff]')
+_STOPWORDS = {
+    'en': ('the', 'and', 'of', 'to', 'in', 'is', 'that', 'for', 'it', 'with', 'as', 'was', 'on', 'are', 'this', 'be', 'by', 'have', 'from', 'or'),
+    'es': ('el', 'la', 'los', 'las', 'que', 'del', 'y', 'en', 'un', 'una', 'por', 'con', 'para', 'es', 'se', 'su', 'al', 'lo', 'como', 'pero'),
+    'fr': ('le', 'la', 'les', 'des', 'et', 'est', 'du', 'un', 'une', 'que', 'qui', 'dans', 'pour', 'pas', 'sur', 'au', 'avec', 'ce', 'il', 'sont'),
+    'de': ('der', 'die', 'das', 'und', 'ist', 'nicht', 'mit', 'den', 'von', 'zu', 'ein', 'eine', 'auf', 'sich', 'dem', 'auch', 'es', 'im', 'wird', 'sind'),
+}
+_STOPWORD_RES = tuple(
+    (language, re.compile(r'\b(?:' + '|'.join(words) + r')\b', re.IGNORECASE))
+    for language, words in _STOPWORDS.items()
+)
+
+
+def _guess_language(sample: str) -> Optional[str]:
+    """Guess the language from script ranges and stopword frequency, or None when ambiguous"""
+    letters = sum(1 for char in sample if char.isalpha())
+    if not letters:
+        return None
+    
+    han = len(_HAN_RE.findall(sample))
+    kana = len(_KANA_RE.findall(sample))
+    if (han + kana) * 2 > letters:
+        return 'ja' if kana else 'zh-cn'
+    for language, pattern in _SCRIPT_PATTERNS:
+        if len(pattern.findall(sample)) * 2 > letters:
+            return language
+    
+    scores = sorted(
+        ((sum(1 for _ in pattern.finditer(sample)), language) for language, pattern in _STOPWORD_RES),
+        reverse=True
+    )
+    (best, language), (runner_up, _) = scores[0], scores[1]
+    if best >= 3 and best >= 2 * runner_up:
+        return language
+    return None
+
+
+# Precompiled patterns for response parsing
+_CODE_FENCE_START_RE = re.compile(r'^```(?:json)?\s*')
+_CODE_FENCE_END_RE = re.compile(r'\s*```$')
+_JSON_BLOCK_RE = re.compile(r'\{.*\}|\[.*\]', re.DOTALL)
+_SUMMARY_LEADING_ARTIFACTS_RE = re.compile(r'^[{}\[\]"]*')
+_SUMMARY_TRAILING_ARTIFACTS_RE = re.compile(r'[{}\[\]"]*$')
+
+# Precompiled patterns for text cleanup and statistics
+_WHITESPACE_RE = re.compile(r'\s+')
+# Deletion table for C0/C1 control characters other than tab, newline, carriage return and NEL
+_CONTROL_CHARS_TABLE = dict.fromkeys(
+    [*range(0x00, 0x09), 0x0b, 0x0c, *range(0x0e, 0x20), *range(0x7f, 0x85), *range(0x86, 0xa0)]
+)
+_SENTENCE_SPLIT_RE = re.compile(r'[.!?]+')
+# A sentence is a non-blank stretch between terminators, matching the non-blank pieces of _SENTENCE_SPLIT_RE.split
+_SENTENCE_RE = re.compile(r'[^.!?]*[^.!?\s][^.!?]*')
+
+# Key information patterns, combined into one alternation so the text is scanned once.
+# Earlier alternatives win where matches would overlap; (?a:...) keeps ASCII-only classes scoped.
+_KEY_INFO_PATTERNS = {
+    'url': r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+',
+    'email': r'(?a:\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b)',
+    'date': r'(?a:\b(?:\d{1,2}[/\-]\d{1,2}[/\-]\d{2,4}|\d{4}[/\-]\d{1,2}[/\-]\d{1,2})\b)',
+    'phone': r'(?a:(?:\+?1[-.\s]?)?\(?(?P<phone_area>[0-9]{3})\)?[-.\s]?(?P<phone_exchange>[0-9]{3})[-.\s]?(?P<phone_number>[0-9]{4}))',
+    'amount': r'(?a:\$\s?[\d,]+\.?\d*|\b\d+\.\d{2}\s?(?:USD|EUR|GBP)\b)',
+    'name': r'\b[A-Z][a-z]+\s+[A-Z][a-z]+\b',
+}
+_KEY_INFO_RE = re.compile("|".join(f"(?P<{kind}>{pattern})" for kind, pattern in _KEY_INFO_PATTERNS.items()))
+_KEY_INFO_FIELDS = (
+    ('email', 'emails'),
+    ('phone', 'phone_numbers'),
+    ('date', 'dates'),
+    ('amount', 'monetary_amounts'),
+    ('url', 'urls'),
+    ('name', 'potential_names'),
+)
+
+class _JsonEndScanner:
+    """Track streamed text until the first top-level JSON object or array closes"""
+    
+    def __init__(self):
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+    
+    def feed(self, piece: str) -> bool:
+        """Consume a streamed fragment; return True once the JSON value is complete"""
+        for char in piece:
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == '\\':
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+            elif char in '{[':
+                self.depth += 1
+            elif char in '}]' and self.depth:
+                self.depth -= 1
+                if not self.depth:
+                    return True
+            elif char == '"' and self.depth:
+                self.in_string = True
+        return False
+
+def _truncated_json_candidates(text: str) -> List[str]:
+    """Close a JSON value cut off mid-stream (e.g. by num_predict) into parseable candidates"""
+    start = min((i for i in (text.find('{'), text.find('[')) if i >= 0), default=-1)
+    if start < 0:
+        return []
+    
+    closers = []
+    in_string = escaped = False
+    last_comma = None
+    for index in range(start, len(text)):
+        char = text[index]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in '{[':
+            closers.append('}' if char == '{' else ']')
+        elif char in '}]':
+            if closers:
+                closers.pop()
+            if not closers:
+                return []  # The value is complete, so truncation is not the problem
+        elif char == ',':
+            last_comma = (index, len(closers))
+    
+    # Close everything that is open, then retry without the trailing partial member
+    candidates = [text[start:] + ('"' if in_string else '') + ''.join(reversed(closers))]
+    if last_comma:
+        index, depth = last_comma
+        candidates.append(text[start:index] + ''.join(reversed(closers[:depth])))
+    return candidates
+
+
+@functools.lru_cache(maxsize=32)
+def _encoded_system_message(system_prompt: str) -> bytes:
+    """JSON-encode a system message once; system prompts are a handful of constants"""
+    return orjson.dumps({"role": "system", "content": system_prompt})
+
+
+# Completed Llama responses, shared by every service instance in the process and kept in LRU order
+_RESPONSE_CACHE_SIZE = int(os.getenv("OLLAMA_RESPONSE_CACHE_SIZE", "512"))
+_response_cache: "OrderedDict[bytes, str]" = OrderedDict()
+
 class OllamaAIService:
     """AI Service using local Ollama/Llama3 for document analysis"""
     
@@ -20,13 +232,23 @@ class OllamaAIService:
         self.model_name = model_name or os.getenv("OLLAMA_MODEL", "llama3.2:3b")
         self.embed_model = os.getenv("OLLAMA_EMBED_MODEL", "nomic-embed-text")
         self.timeout = float(os.getenv("OLLAMA_TIMEOUT", "120.0"))
+        # How long Ollama keeps the model, and the prefilled system prompts in its cache, loaded between requests
+        self.keep_alive = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
         
-        # HTTP client for async requests
-        self.client = httpx.AsyncClient(timeout=httpx.Timeout(self.timeout))
+        # HTTP client for async requests; a pooled keep-alive client lets concurrent analyses
+        # share connections (pair with OLLAMA_NUM_PARALLEL on the server)
+        self.client = httpx.AsyncClient(
+            timeout=httpx.Timeout(self.timeout),
+            limits=httpx.Limits(max_keepalive_connections=64, max_connections=256),
+            transport=httpx.AsyncHTTPTransport(retries=2)
+        )
         
         # Initialize prompts manager
         self.prompts = DocumentPrompts()
         
+        # In-flight chat requests keyed like the response cache
+        self._inflight: Dict[bytes, asyncio.Future] = {}
+        
         logger.info(f"Initialized Ollama AI Service with host: {ollama_host}")
         
     async def initialize_models(self):
@@ -62,6 +284,9 @@ class OllamaAIService:
                         logger.info(f"Using fallback model: {self.model_name}")
                 
                 logger.info(f"Using Ollama model: {self.model_name}")
+                
+                # Prime Ollama's prompt cache with the shared system prompt
+                await self._warm_up_prompt_cache()
                 return True
             else:
                 logger.error(f"Ollama not accessible: {response.status_code}")
@@ -75,7 +300,7 @@ class OllamaAIService:
         """Comprehensive document analysis using local Llama3"""
         try:
             # Clean and prepare text
-            cleaned_text = self._clean_text(text)
+            cleaned_text = await asyncio.to_thread(self._clean_text, text)
             
             if not cleaned_text.strip():
                 return self._empty_analysis_result()
@@ -83,24 +308,19 @@ class OllamaAIService:
             # Detect language first (lightweight operation)
             language = await self._detect_language(cleaned_text)
             
-            # Run AI analysis tasks
-            analysis_tasks = await asyncio.gather(
-                self._classify_document_with_llama(cleaned_text),
-                self._extract_entities_with_llama(cleaned_text),
-                self._analyze_sentiment_with_llama(cleaned_text),
-                self._generate_summary_with_llama(cleaned_text),
-                return_exceptions=True
+            # Run classification, entities, sentiment and summary as one AI call while
+            # the regex key-information scan runs in a worker thread
+            combined, key_info = await asyncio.gather(
+                self._analyze_combined_with_llama(cleaned_text),
+                self._extract_key_information(cleaned_text)
             )
             
-            # Extract key information using regex (lightweight)
-            key_info = await self._extract_key_information(cleaned_text)
-            
             # Combine results
             analysis_result = {
-                'document_classification': analysis_tasks[0] if not isinstance(analysis_tasks[0], Exception) else {'type': 'unknown', 'confidence': 0.0},
-                'entities': analysis_tasks[1] if not isinstance(analysis_tasks[1], Exception) else [],
-                'sentiment_analysis': analysis_tasks[2] if not isinstance(analysis_tasks[2], Exception) else {'overall_sentiment': 'neutral', 'confidence': 0.5},
-                'summary': analysis_tasks[3] if not isinstance(analysis_tasks[3], Exception) else 'Summary generation failed',
+                'document_classification': combined['document_classification'],
+                'entities': combined['entities'],
+                'sentiment_analysis': combined['sentiment_analysis'],
+                'summary': combined['summary'],
                 'key_information': key_info,
                 'language': language,
                 'text_statistics': self._calculate_text_statistics(cleaned_text)
@@ -112,231 +332,253 @@ class OllamaAIService:
             logger.error(f"Document analysis error: {str(e)}")
             return self._empty_analysis_result(error=str(e))
     
-    async def _query_llama(self, prompt: str, system_prompt: Optional[str] = None) -> str:
+    async def _warm_up_prompt_cache(self):
+        """Send a minimal chat so the combined-analysis system prompt is already prefilled"""
+        try:
+            await self._query_llama("ok", self.prompts.get_combined_analysis_system_prompt(), num_predict=1,
+                                   use_cache=False)
+            logger.info("Ollama prompt cache warmed up")
+        except Exception as e:
+            logger.warning(f"Ollama prompt cache warm-up failed: {e}")
+    
+    async def _query_llama(self, prompt: str, system_prompt: Optional[str] = None, num_predict: int = 512,
+                           use_cache: bool = True, stop_at_json_end: bool = False,
+                           output_format: Optional[str] = None) -> str:
         """Send a query to local Llama3 and get response"""
+        key = self._response_cache_key(prompt, system_prompt, num_predict, output_format)
+        if use_cache:
+            cached = _response_cache.get(key)
+            if cached is not None:
+                _response_cache.move_to_end(key)
+                return cached
+        
+        # Concurrent identical queries (e.g. retried documents) share a single Ollama request
+        pending = self._inflight.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+        
+        request = asyncio.ensure_future(
+            self._post_chat(prompt, system_prompt, num_predict, stop_at_json_end, output_format)
+        )
+        self._inflight[key] = request
         try:
-            # Prepare the request payload
+            response = await asyncio.shield(request)
+        finally:
+            if self._inflight.get(key) is request:
+                del self._inflight[key]
+        
+        # Failed queries return "" and are not cached; neither are uncached queries such as the warm-up
+        if use_cache and response and _RESPONSE_CACHE_SIZE > 0:
+            _response_cache[key] = response
+            _response_cache.move_to_end(key)
+            while len(_response_cache) > _RESPONSE_CACHE_SIZE:
+                _response_cache.popitem(last=False)
+        
+        return response
+    
+    def _response_cache_key(self, prompt: str, system_prompt: Optional[str], num_predict: int,
+                            output_format: Optional[str] = None) -> bytes:
+        """Hash the model, prompts and output settings into a compact cache key"""
+        hasher = hashlib.blake2b(digest_size=16)
+        hasher.update(_encoded_system_message(system_prompt) if system_prompt else b"")
+        hasher.update(b'\x00')
+        for part in (self.model_name, prompt, str(num_predict), output_format or ""):
+            hasher.update(part.encode('utf-8'))
+            hasher.update(b'\x00')
+        return hasher.digest()
+    
+    async def _post_chat(self, prompt: str, system_prompt: Optional[str], num_predict: int,
+                         stop_at_json_end: bool = False, output_format: Optional[str] = None) -> str:
+        """Stream a single chat request from Ollama and return the message content"""
+        try:
+            # System prompt goes first so identical prefixes hit Ollama's prompt cache;
+            # its encoded form is cached, so only the user message is serialized per call
+            messages = [orjson.dumps({"role": "user", "content": prompt})]
+            if system_prompt:
+                messages.insert(0, _encoded_system_message(system_prompt))
+            
+            # Prepare the request payload; messages are spliced in as pre-encoded JSON below
             payload = {
                 "model": self.model_name,
-                "prompt": prompt,
-                "stream": False,
+                "stream": True,
+                "keep_alive": self.keep_alive,
                 "options": {
                     "temperature": 0.3,  # Lower temperature for more consistent results
                     "top_p": 0.9,
-                    "num_predict": 512   # Limit response length
+                    "num_predict": num_predict   # Limit response length
                 }
             }
+            # "json" makes Ollama constrain decoding to a valid JSON object
+            if output_format:
+                payload["format"] = output_format
+            
+            parts = []
+            scanner = _JsonEndScanner() if stop_at_json_end else None
+            
+            # Stream the response from Ollama as newline-delimited JSON chunks
+            async with self.client.stream(
+                "POST",
+                f"{self.ollama_host}/api/chat",
+                content=b"".join((b'{"messages":[', b",".join(messages), b"],", orjson.dumps(payload)[1:])),
+                headers={"Content-Type": "application/json"}
+            ) as response:
+                if response.status_code != 200:
+                    body = await response.aread()
+                    logger.error(f"Ollama request failed: {response.status_code} - {body.decode('utf-8', 'replace')}")
+                    return ""
+                
+                async for line in response.aiter_lines():
+                    if not line:
+                        continue
+                    chunk = orjson.loads(line)
+                    piece = chunk.get('message', {}).get('content', '')
+                    if piece:
+                        parts.append(piece)
+                        # Closing the stream early stops generation of trailing prose
+                        if scanner and scanner.feed(piece):
+                            break
+                    if chunk.get('done'):
+                        break
             
-            if system_prompt:
-                payload["system"] = system_prompt
-            
-            # Send request to Ollama
-            response = await self.client.post(
-                f"{self.ollama_host}/api/generate",
-                json=payload
-            )
-            
-            if response.status_code == 200:
-                result = response.json()
-                return result.get('response', '').strip()
-            else:
-                logger.error(f"Ollama request failed: {response.status_code} - {response.text}")
-                return ""
+            return "".join(parts).strip()
                 
         except Exception as e:
             logger.error(f"Llama query error: {str(e)}")
             return ""
     
-    async def _classify_document_with_llama(self, text: str) -> Dict[str, Any]:
-        """Classify document type using Llama3"""
+    def _parse_json_response(self, response: str) -> Any:
+        """Parse JSON from a Llama response, tolerating code fences and surrounding prose"""
+        cleaned = response.strip()
+        
+        # Strip markdown code fences
+        if cleaned.startswith('```'):
+            cleaned = _CODE_FENCE_START_RE.sub('', cleaned)
+            cleaned = _CODE_FENCE_END_RE.sub('', cleaned)
+        
         try:
-            start_time = asyncio.get_event_loop().time()
-            
-            # Generate prompts using centralized prompt manager
-            system_prompt = self.prompts.get_classification_system_prompt()
-            user_prompt = self.prompts.get_classification_prompt(text)
-            
-            # Log prompt usage
-            self.prompts.log_prompt_usage("classification", len(text))
-            
-            response = await self._query_llama(user_prompt, system_prompt)
-            
-            if response:
-                # Try to parse JSON response
+            return orjson.loads(cleaned)
+        except orjson.JSONDecodeError:
+            # Recover the outermost JSON object or array embedded in the text
+            match = _JSON_BLOCK_RE.search(cleaned)
+            if match:
                 try:
-                    result = json.loads(response)
-                    response_time = asyncio.get_event_loop().time() - start_time
-                    self.prompts.log_prompt_usage("classification", len(text), response_time)
-                    
-                    return {
-                        'type': result.get('type', 'unknown'),
-                        'confidence': float(result.get('confidence', 0.5)),
-                        'reasoning': result.get('reasoning', ''),
-                        'secondary_type': result.get('secondary_type', ''),
-                        'key_indicators': result.get('key_indicators', [])
-                    }
-                except json.JSONDecodeError:
-                    # Fallback parsing
-                    type_match = re.search(r'"type":\s*"([^"]+)"', response)
-                    conf_match = re.search(r'"confidence":\s*([0-9.]+)', response)
-                    
-                    return {
-                        'type': type_match.group(1) if type_match else 'unknown',
-                        'confidence': float(conf_match.group(1)) if conf_match else 0.5
-                    }
-            
-            # Fallback to simple rule-based classification
-            return await self._simple_classify_document(text)
-            
-        except Exception as e:
-            logger.error(f"Document classification error: {str(e)}")
-            return {'type': 'unknown', 'confidence': 0.0}
-    
-    async def _extract_entities_with_llama(self, text: str) -> List[Dict[str, Any]]:
-        """Extract named entities using Llama3"""
-        try:
-            start_time = asyncio.get_event_loop().time()
+                    return orjson.loads(match.group(0))
+                except orjson.JSONDecodeError:
+                    pass
             
-            # Generate prompts using centralized prompt manager
-            system_prompt = self.prompts.get_entity_extraction_system_prompt()
-            user_prompt = self.prompts.get_entity_extraction_prompt(text)
-            
-            # Log prompt usage
-            self.prompts.log_prompt_usage("entity_extraction", len(text))
-            
-            response = await self._query_llama(user_prompt, system_prompt)
-            
-            if response:
+            # Repair output that was cut off before its closing brackets
+            for candidate in _truncated_json_candidates(cleaned):
                 try:
-                    # Try to parse JSON response
-                    entities = json.loads(response)
-                    if isinstance(entities, list):
-                        response_time = asyncio.get_event_loop().time() - start_time
-                        self.prompts.log_prompt_usage("entity_extraction", len(text), response_time)
-                        return entities[:20]  # Limit to top 20
-                except json.JSONDecodeError:
-                    # Try to extract entities using regex
-                    entity_matches = re.findall(r'"text":\s*"([^"]+)"[^}]*"label":\s*"([^"]+)"', response)
-                    return [{'text': text, 'label': label, 'confidence': 0.8} for text, label in entity_matches[:20]]
-            
-            return []
-            
-        except Exception as e:
-            logger.error(f"Entity extraction error: {str(e)}")
-            return []
+                    return orjson.loads(candidate)
+                except orjson.JSONDecodeError:
+                    continue
+            raise
+    
+    def _build_classification(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Normalize a parsed classification object"""
+        return {
+            'type': result.get('type', 'unknown'),
+            'confidence': float(result.get('confidence', 0.5)),
+            'reasoning': result.get('reasoning', ''),
+            'secondary_type': result.get('secondary_type', ''),
+            'key_indicators': result.get('key_indicators', [])
+        }
+    
+    def _build_sentiment(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Normalize a parsed sentiment object"""
+        sentiment = result.get('sentiment', 'neutral')
+        confidence = float(result.get('confidence', 0.5))
+        
+        return {
+            'overall_sentiment': sentiment,
+            'confidence': confidence,
+            'reasoning': result.get('reasoning', ''),
+            'key_phrases': result.get('key_phrases', []),
+            'intensity': result.get('intensity', 'medium'),
+            'polarity': 0.5 if sentiment == 'positive' else (-0.5 if sentiment == 'negative' else 0.0),
+            'subjectivity': result.get('subjectivity', confidence)
+        }
+    
+    def _clean_summary(self, summary: str) -> str:
+        """Strip JSON artifacts from a generated summary and cap its length"""
+        summary = summary.strip()
+        summary = _SUMMARY_LEADING_ARTIFACTS_RE.sub('', summary)
+        summary = _SUMMARY_TRAILING_ARTIFACTS_RE.sub('', summary)
+        
+        return summary[:500] + "..." if len(summary) > 500 else summary
     
-    async def _analyze_sentiment_with_llama(self, text: str) -> Dict[str, Any]:
-        """Analyze sentiment using Llama3"""
+    async def _analyze_combined_with_llama(self, text: str) -> Dict[str, Any]:
+        """Classify, extract entities, analyze sentiment and summarize with a single Llama3 call"""
+        parsed: Dict[str, Any] = {}
+        
         try:
             start_time = asyncio.get_event_loop().time()
             
             # Generate prompts using centralized prompt manager
-            system_prompt = self.prompts.get_sentiment_system_prompt()
-            user_prompt = self.prompts.get_sentiment_prompt(text)
+            system_prompt = self.prompts.get_combined_analysis_system_prompt()
+            user_prompt = self.prompts.get_combined_analysis_prompt(text)
             
             # Log prompt usage
-            self.prompts.log_prompt_usage("sentiment", len(text))
+            self.prompts.log_prompt_usage(PromptType.COMBINED_ANALYSIS, len(text))
             
-            response = await self._query_llama(user_prompt, system_prompt)
+            response = await self._query_llama(
+                user_prompt, system_prompt, num_predict=1024, stop_at_json_end=True, output_format="json"
+            )
             
             if response:
-                try:
-                    result = json.loads(response)
-                    sentiment = result.get('sentiment', 'neutral')
-                    confidence = float(result.get('confidence', 0.5))
-                    
+                result = self._parse_json_response(response)
+                if isinstance(result, dict):
+                    parsed = result
                     response_time = asyncio.get_event_loop().time() - start_time
-                    self.prompts.log_prompt_usage("sentiment", len(text), response_time)
-                    
-                    return {
-                        'overall_sentiment': sentiment,
-                        'confidence': confidence,
-                        'reasoning': result.get('reasoning', ''),
-                        'key_phrases': result.get('key_phrases', []),
-                        'intensity': result.get('intensity', 'medium'),
-                        'polarity': 0.5 if sentiment == 'positive' else (-0.5 if sentiment == 'negative' else 0.0),
-                        'subjectivity': result.get('subjectivity', confidence)
-                    }
-                except (json.JSONDecodeError, ValueError):
-                    # Fallback parsing
-                    if 'positive' in response.lower():
-                        sentiment = 'positive'
-                    elif 'negative' in response.lower():
-                        sentiment = 'negative'
-                    else:
-                        sentiment = 'neutral'
+                    self.prompts.log_prompt_usage(PromptType.COMBINED_ANALYSIS, len(text), response_time)
                     
-                    return {
-                        'overall_sentiment': sentiment,
-                        'confidence': 0.7,
-                        'polarity': 0.5 if sentiment == 'positive' else (-0.5 if sentiment == 'negative' else 0.0),
-                        'subjectivity': 0.7
-                    }
-            
-            # Fallback to TextBlob
-            return await self._simple_analyze_sentiment(text)
-            
         except Exception as e:
-            logger.error(f"Sentiment analysis error: {str(e)}")
-            return await self._simple_analyze_sentiment(text)
-    
-    async def _generate_summary_with_llama(self, text: str) -> str:
-        """Generate summary using Llama3"""
+            logger.error(f"Combined analysis error: {str(e)}")
+        
+        # Fall back per subfield when the combined response is missing or malformed
         try:
-            # For very short texts, return as-is
-            if len(text) < 200:
-                return text[:150] + "..." if len(text) > 150 else text
-            
-            start_time = asyncio.get_event_loop().time()
-            
-            # Generate prompts using centralized prompt manager
-            system_prompt = self.prompts.get_summarization_system_prompt()
-            user_prompt = self.prompts.get_summarization_prompt(text)
-            
-            # Log prompt usage
-            self.prompts.log_prompt_usage("summarization", len(text))
-            
-            response = await self._query_llama(user_prompt, system_prompt)
-            
-            if response and len(response.strip()) > 10:
-                # Clean up the response
-                summary = response.strip()
-                # Remove any JSON artifacts
-                summary = re.sub(r'^[{}\[\]"]*', '', summary)
-                summary = re.sub(r'[{}\[\]"]*$', '', summary)
-                
-                response_time = asyncio.get_event_loop().time() - start_time
-                self.prompts.log_prompt_usage("summarization", len(text), response_time)
-                
-                return summary[:500] + "..." if len(summary) > 500 else summary
-            
-            # Fallback to extractive summarization
-            return await self._simple_generate_summary(text)
-            
-        except Exception as e:
-            logger.error(f"Summary generation error: {str(e)}")
-            return await self._simple_generate_summary(text)
+            classification = self._build_classification(parsed['classification'])
+        except Exception:
+            classification = await self._simple_classify_document(text)
+        
+        entities = parsed.get('entities')
+        entities = entities[:20] if isinstance(entities, list) else []
+        
+        try:
+            sentiment = self._build_sentiment(parsed['sentiment'])
+        except Exception:
+            sentiment = await self._simple_analyze_sentiment(text)
+        
+        if len(text) < 200:
+            summary = text[:150] + "..." if len(text) > 150 else text
+        else:
+            summary = parsed.get('summary')
+            if isinstance(summary, str) and len(summary.strip()) > 10:
+                summary = self._clean_summary(summary)
+            else:
+                summary = await self._simple_generate_summary(text)
+        
+        return {
+            'document_classification': classification,
+            'entities': entities,
+            'sentiment_analysis': sentiment,
+            'summary': summary
+        }
     
     # Fallback methods using simpler approaches
     async def _simple_classify_document(self, text: str) -> Dict[str, Any]:
         """Simple rule-based document classification"""
-        document_types = {
-            'invoice': ['invoice', 'bill', 'payment', 'amount', 'total', 'due'],
-            'contract': ['agreement', 'contract', 'terms', 'conditions', 'party'],
-            'report': ['report', 'analysis', 'conclusion', 'findings', 'summary'],
-            'letter': ['dear', 'sincerely', 'regards', 'letter'],
-            'resume': ['experience', 'education', 'skills', 'work', 'cv'],
-            'legal': ['law', 'legal', 'court', 'jurisdiction', 'whereas'],
-            'academic': ['abstract', 'introduction', 'methodology', 'references'],
-            'technical': ['technical', 'specification', 'implementation', 'system']
-        }
-        
         text_lower = text.lower()
-        scores = {}
+        scores = dict.fromkeys(_DOCUMENT_TYPE_KEYWORDS, 0.0)
         
-        for doc_type, keywords in document_types.items():
-            score = sum(1 for keyword in keywords if keyword in text_lower)
-            scores[doc_type] = score / len(keywords)
+        # One pass over the text for all keywords, stopping once every keyword has been seen
+        found = set()
+        for _, (keyword_id, doc_type, weight) in _KEYWORD_AUTOMATON.iter(text_lower):
+            if keyword_id not in found:
+                found.add(keyword_id)
+                scores[doc_type] += weight
+                if len(found) == len(_KEYWORD_WEIGHTS):
+                    break
         
         best_type = max(scores.keys(), key=lambda k: scores[k])
         confidence = scores[best_type]
@@ -347,11 +589,15 @@ class OllamaAIService:
         }
     
     async def _simple_analyze_sentiment(self, text: str) -> Dict[str, Any]:
-        """Simple sentiment analysis using TextBlob"""
+        """Simple sentiment analysis using compiled lexicon patterns"""
         try:
-            blob = TextBlob(text[:1000])
-            polarity = blob.sentiment.polarity
-            subjectivity = blob.sentiment.subjectivity
+            sample_text = text[:4000]
+            positive = len(_POSITIVE_RE.findall(sample_text))
+            negative = len(_NEGATIVE_RE.findall(sample_text))
+            word_count = len(sample_text.split())
+            
+            polarity = (positive - negative) / max(positive + negative, 1)
+            subjectivity = min((positive + negative) / max(word_count, 1), 1.0)
             
             if polarity > 0.1:
                 sentiment = 'positive'
@@ -379,7 +625,7 @@ class OllamaAIService:
     async def _simple_generate_summary(self, text: str) -> str:
         """Simple extractive summarization"""
         try:
-            sentences = re.split(r'[.!?]+', text)
+            sentences = _SENTENCE_SPLIT_RE.split(text)
             sentences = [s.strip() for s in sentences if s.strip() and len(s.strip()) > 20]
             
             if len(sentences) <= 3:
@@ -406,49 +652,42 @@ class OllamaAIService:
     async def _extract_key_information(self, text: str) -> Dict[str, Any]:
         """Extract key information using regex patterns"""
         try:
-            key_info = {}
-            
-            # Email addresses
-            emails = re.findall(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', text)
-            if emails:
-                key_info['emails'] = list(set(emails))
-            
-            # Phone numbers
-            phones = re.findall(r'(?:\+?1[-.\s]?)?\(?([0-9]{3})\)?[-.\s]?([0-9]{3})[-.\s]?([0-9]{4})', text)
-            if phones:
-                key_info['phone_numbers'] = [f"({area}){exchange}-{number}" for area, exchange, number in phones]
-            
-            # Dates
-            dates = re.findall(r'\b(?:\d{1,2}[/\-]\d{1,2}[/\-]\d{2,4}|\d{4}[/\-]\d{1,2}[/\-]\d{1,2})\b', text)
-            if dates:
-                key_info['dates'] = list(set(dates))
-            
-            # Currency amounts
-            amounts = re.findall(r'\$\s?[\d,]+\.?\d*|\b\d+\.\d{2}\s?(?:USD|EUR|GBP)\b', text)
-            if amounts:
-                key_info['monetary_amounts'] = list(set(amounts))
-            
-            # URLs
-            urls = re.findall(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+', text)
-            if urls:
-                key_info['urls'] = list(set(urls))
-            
-            # Potential names
-            potential_names = re.findall(r'\b[A-Z][a-z]+\s+[A-Z][a-z]+\b', text)
-            if potential_names:
-                key_info['potential_names'] = list(set(potential_names))
-            
-            return key_info
+            # The scan is CPU-bound over the whole document, so keep it off the event loop
+            return await asyncio.to_thread(self._scan_key_information, text)
             
         except Exception as e:
             logger.error(f"Key information extraction error: {str(e)}")
             return {}
     
+    def _scan_key_information(self, text: str) -> Dict[str, Any]:
+        """Collect emails, phones, dates, amounts, URLs and names in one regex pass"""
+        buckets = {kind: [] for kind in _KEY_INFO_PATTERNS}
+        
+        for match in _KEY_INFO_RE.finditer(text):
+            kind = match.lastgroup
+            if kind == 'phone':
+                buckets[kind].append(
+                    f"({match.group('phone_area')}){match.group('phone_exchange')}-{match.group('phone_number')}"
+                )
+            else:
+                buckets[kind].append(match.group())
+        
+        key_info = {}
+        for kind, field in _KEY_INFO_FIELDS:
+            if buckets[kind]:
+                key_info[field] = list(dict.fromkeys(buckets[kind]))
+        
+        return key_info
+    
     async def _detect_language(self, text: str) -> str:
         """Detect the language of the text"""
         try:
-            sample_text = text[:1000] if len(text) > 1000 else text
-            language = detect(sample_text)
+            language = _guess_language(text[:512])
+            if language:
+                return language
+            
+            sample_text = text[:1000]
+            language = await asyncio.to_thread(detect, sample_text)
             return language
         except Exception:
             return 'en'
@@ -458,27 +697,30 @@ class OllamaAIService:
         if not text:
             return ""
         
-        # Remove excessive whitespace
-        text = re.sub(r'\s+', ' ', text)
+        # Remove control characters first so gaps they leave collapse with the whitespace
+        text = text.translate(_CONTROL_CHARS_TABLE)
         
-        # Remove control characters
-        text = re.sub(r'[\x00-\x08\x0b\x0c\x0e-\x1f\x7f-\x84\x86-\x9f]', '', text)
+        # Remove excessive whitespace
+        text = _WHITESPACE_RE.sub(' ', text)
         
         return text.strip()
     
     def _calculate_text_statistics(self, text: str) -> Dict[str, Any]:
         """Calculate basic text statistics"""
         try:
-            words = text.split()
-            sentences = re.split(r'[.!?]+', text)
-            sentences = [s for s in sentences if s.strip()]
+            if not text:
+                word_count = sentence_count = 0
+            else:
+                # Cleaned text has single spaces between words, so counting separators is enough
+                word_count = text.count(' ') - text.count('  ') + 1
+                sentence_count = sum(1 for _ in _SENTENCE_RE.finditer(text))
             
             return {
                 'character_count': len(text),
-                'word_count': len(words),
-                'sentence_count': len(sentences),
-                'average_words_per_sentence': len(words) / len(sentences) if sentences else 0,
-                'average_characters_per_word': len(text) / len(words) if words else 0
+                'word_count': word_count,
+                'sentence_count': sentence_count,
+                'average_words_per_sentence': word_count / sentence_count if sentence_count else 0,
+                'average_characters_per_word': len(text) / word_count if word_count else 0
             }
         except Exception:
             return {
@@ -13,9 +13,30 @@ Configuration includes:
 - Task-specific optimizations
 """
 
-from typing import Dict, Any, List
+import logging
+import re
+from types import MappingProxyType
+from typing import Dict, Any, List, Mapping, Optional, Tuple
 from dataclasses import dataclass
 
+logger = logging.getLogger(__name__)
+
+def _freeze(value: Any) -> Any:
+    """Recursively turn dicts into read-only mappings and lists into tuples"""
+    if isinstance(value, Mapping):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+def _thaw(value: Any) -> Any:
+    """Copy a frozen table back into plain dicts and lists"""
+    if isinstance(value, Mapping):
+        return {key: _thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw(item) for item in value]
+    return value
+
 @dataclass
 class ModelConfig:
     """Configuration for model parameters"""
@@ -36,7 +57,7 @@ class PromptConfig:
 # MODEL CONFIGURATIONS
 # =============================================================================
 
-MODEL_CONFIGS = {
+MODEL_CONFIGS = MappingProxyType({
     "classification": ModelConfig(
         temperature=0.2,  # Lower for more consistent results
         top_p=0.8,
@@ -67,13 +88,13 @@ MODEL_CONFIGS = {
         max_tokens=1024,
         timeout=180.0
     )
-}
+})
 
 # =============================================================================
 # PROMPT CONFIGURATIONS
 # =============================================================================
 
-PROMPT_CONFIGS = {
+PROMPT_CONFIGS = MappingProxyType({
     "classification": PromptConfig(
         max_input_length=2000,
         confidence_threshold=0.8,
@@ -98,13 +119,13 @@ PROMPT_CONFIGS = {
         retry_attempts=2,
         fallback_enabled=True
     )
-}
+})
 
 # =============================================================================
 # CUSTOM PROMPT TEMPLATES
 # =============================================================================
 
-CUSTOM_PROMPTS = {
+CUSTOM_PROMPTS = MappingProxyType({
     # Enhanced classification for specific industries
     "legal_classification": {
         "system": """You are a legal document classification expert specializing in law firm documents.
@@ -260,13 +281,35 @@ CUSTOM_PROMPTS = {
         4. Patient care implications
         5. Healthcare workflow integration"""
     }
-}
+})
+
+
+def _split_user_templates(prompts: Mapping[str, Dict[str, str]]) -> Dict[str, Tuple[str, str]]:
+    """Split each custom user template around its single {text} slot"""
+    parts = {}
+    for name, prompt in prompts.items():
+        before, _, after = prompt["user"].partition("{text}")
+        parts[name] = (before, after)
+    return parts
+
+
+# (before, after) halves of each custom user template, so rendering is a plain concatenation
+_CUSTOM_PROMPT_PARTS = _split_user_templates(CUSTOM_PROMPTS)
+
+
+def render_custom_prompt(name: str, text: str) -> Dict[str, str]:
+    """Return the system prompt and the user prompt with text inserted for a custom template"""
+    before, after = _CUSTOM_PROMPT_PARTS[name]
+    return {
+        "system": CUSTOM_PROMPTS[name]["system"],
+        "user": before + text + after
+    }
 
 # =============================================================================
 # MULTI-LANGUAGE PROMPT VARIATIONS
 # =============================================================================
 
-LANGUAGE_VARIATIONS = {
+LANGUAGE_VARIATIONS = _freeze({
     "es": {  # Spanish
         "classification_instruction": "Clasifica este documento en una de las siguientes categorías:",
         "entity_instruction": "Extrae las entidades nombradas importantes del texto:",
@@ -320,13 +363,22 @@ LANGUAGE_VARIATIONS = {
             "technical": "technisch"
         }
     }
-}
+})
+
+# Localized document type label (casefolded) -> English type, per language, built once at import
+_DOCUMENT_TYPE_REVERSE: Mapping[str, Mapping[str, str]] = MappingProxyType({
+    language: MappingProxyType({
+        localized.casefold(): document_type
+        for document_type, localized in lang_config["document_types"].items()
+    })
+    for language, lang_config in LANGUAGE_VARIATIONS.items()
+})
 
 # =============================================================================
 # PERFORMANCE THRESHOLDS
 # =============================================================================
 
-PERFORMANCE_THRESHOLDS = {
+PERFORMANCE_THRESHOLDS = _freeze({
     "response_time": {
         "excellent": 2.0,   # seconds
         "good": 5.0,
@@ -346,13 +398,13 @@ PERFORMANCE_THRESHOLDS = {
         "medium": 0.7,
         "low": 0.5
     }
-}
+})
 
 # =============================================================================
 # TASK-SPECIFIC OPTIMIZATIONS
 # =============================================================================
 
-TASK_OPTIMIZATIONS = {
+TASK_OPTIMIZATIONS = _freeze({
     "classification": {
         "speed_mode": {
             "max_input_length": 1000,
@@ -409,13 +461,13 @@ TASK_OPTIMIZATIONS = {
             "focus": "decisions_and_actions"
         }
     }
-}
+})
 
 # =============================================================================
 # FALLBACK CONFIGURATIONS
 # =============================================================================
 
-FALLBACK_CONFIGS = {
+FALLBACK_CONFIGS = _freeze({
     "classification": {
         "rule_based_keywords": {
             "invoice": ["invoice", "bill", "payment", "amount", "total", "due"],
@@ -435,13 +487,32 @@ FALLBACK_CONFIGS = {
             "amount": r'\$\s?[\d,]+\.?\d*|\b\d+\.\d{2}\s?(?:USD|EUR|GBP)\b'
         }
     }
-}
+})
+
+_FALLBACK_ENTITY_PATTERNS = FALLBACK_CONFIGS["entity_extraction"]["regex_patterns"]
+_FALLBACK_ENTITY_NAMES = list(_FALLBACK_ENTITY_PATTERNS)
+
+# Fallback entity patterns compiled once as a single alternation
+_FALLBACK_ENTITY_RE = re.compile(
+    "|".join(f"(?P<{name}>{pattern})" for name, pattern in _FALLBACK_ENTITY_PATTERNS.items())
+)
+
+
+def scan_entities(text: str) -> Dict[str, List[str]]:
+    """Find fallback entities (email, phone, date, amount) in a single pass over the text"""
+    found: Dict[str, List[str]] = {name: [] for name in _FALLBACK_ENTITY_NAMES}
+    if not text:
+        return found
+    
+    for match in _FALLBACK_ENTITY_RE.finditer(text):
+        found[match.lastgroup].append(match.group())
+    return found
 
 # =============================================================================
 # QUALITY CONTROL SETTINGS
 # =============================================================================
 
-QUALITY_CONTROL = {
+QUALITY_CONTROL = _freeze({
     "validation_rules": {
         "min_text_length": 10,
         "max_text_length": 50000,
@@ -468,13 +539,13 @@ QUALITY_CONTROL = {
         "fallback_enabled": True,
         "log_errors": True
     }
-}
+})
 
 # =============================================================================
 # MONITORING AND LOGGING
 # =============================================================================
 
-MONITORING_CONFIG = {
+MONITORING_CONFIG = _freeze({
     "performance_tracking": {
         "track_response_times": True,
         "track_accuracy": True, 
@@ -495,14 +566,20 @@ MONITORING_CONFIG = {
         "high_error_rate_threshold": 0.1,
         "low_accuracy_threshold": 0.7
     }
-}
+})
 
 # =============================================================================
 # UTILITY FUNCTIONS
 # =============================================================================
 
-def get_config(task_type: str, config_type: str = "default") -> Dict[str, Any]:
-    """Get configuration for a specific task type"""
+_DEFAULT_TASK_CONFIG: Mapping[str, Any] = MappingProxyType({
+    "temperature": 0.3,
+    "max_tokens": 512,
+    "confidence_threshold": 0.7
+})
+
+def _build_flat_configs() -> Dict[Tuple[str, str], Any]:
+    """Flatten the config tables into a single (config_type, task_type) -> config map"""
     
     configs = {
         "model": MODEL_CONFIGS,
@@ -510,44 +587,65 @@ def get_config(task_type: str, config_type: str = "default") -> Dict[str, Any]:
         "optimization": TASK_OPTIMIZATIONS,
         "fallback": FALLBACK_CONFIGS
     }
-    
-    if config_type in configs and task_type in configs[config_type]:
-        return configs[config_type][task_type]
-    
-    # Return default configuration
     return {
-        "temperature": 0.3,
-        "max_tokens": 512,
-        "confidence_threshold": 0.7
+        (config_type, task_type): config
+        for config_type, table in configs.items()
+        for task_type, config in table.items()
     }
 
+# Rebuilt by import_config whenever the tables it updates are rebound
+_FLAT_CONFIGS = _build_flat_configs()
+
+def get_config(task_type: str, config_type: str = "default") -> Dict[str, Any]:
+    """Get configuration for a specific task type, or the read-only default configuration
+    
+    Reads the current tables, including any swapped in by import_config.
+    """
+    
+    return _FLAT_CONFIGS.get((config_type, task_type), _DEFAULT_TASK_CONFIG)
+
+# (language, prompt_type) -> instruction, plus the English fallbacks for the known prompt types
+_LANGUAGE_TEMPLATES: Mapping[Tuple[str, str], str] = MappingProxyType({
+    (language, key[:-len("_instruction")]): instruction
+    for language, lang_config in LANGUAGE_VARIATIONS.items()
+    for key, instruction in lang_config.items()
+    if key.endswith("_instruction")
+})
+_DEFAULT_LANGUAGE_TEMPLATES: Mapping[str, str] = MappingProxyType({
+    prompt_type: f"Analyze this document for {prompt_type}:"
+    for prompt_type in ("classification", "entity", "sentiment", "summary")
+})
+
 def get_language_prompt_template(language: str, prompt_type: str) -> str:
     """Get language-specific prompt template"""
     
-    if language in LANGUAGE_VARIATIONS:
-        lang_config = LANGUAGE_VARIATIONS[language]
-        instruction_key = f"{prompt_type}_instruction"
-        
-        if instruction_key in lang_config:
-            return lang_config[instruction_key]
+    template = _LANGUAGE_TEMPLATES.get((language, prompt_type))
+    if template is not None:
+        return template
     
     # Fallback to English
-    return f"Analyze this document for {prompt_type}:"
+    return _DEFAULT_LANGUAGE_TEMPLATES.get(prompt_type) or f"Analyze this document for {prompt_type}:"
+
+def get_english_document_type(language: str, label: str) -> Optional[str]:
+    """Map a localized document type label (e.g. "factura") back to its English type"""
+    
+    reverse_types = _DOCUMENT_TYPE_REVERSE.get(language)
+    if reverse_types is None:
+        return None
+    return reverse_types.get(label.strip().casefold())
+
+_REQUIRED_TASK_FIELDS: Mapping[str, frozenset] = MappingProxyType({
+    "classification": frozenset({"temperature", "max_tokens"}),
+    "entity_extraction": frozenset({"temperature", "max_tokens", "confidence_threshold"}),
+    "sentiment": frozenset({"temperature", "max_tokens"}),
+    "summarization": frozenset({"temperature", "max_tokens"})
+})
 
 def validate_task_config(task_type: str, config: Dict[str, Any]) -> bool:
     """Validate task configuration"""
     
-    required_fields = {
-        "classification": ["temperature", "max_tokens"],
-        "entity_extraction": ["temperature", "max_tokens", "confidence_threshold"],
-        "sentiment": ["temperature", "max_tokens"],
-        "summarization": ["temperature", "max_tokens"]
-    }
-    
-    if task_type in required_fields:
-        return all(field in config for field in required_fields[task_type])
-    
-    return True
+    # Tasks without required fields validate against the empty set
+    return _REQUIRED_TASK_FIELDS.get(task_type, frozenset()).issubset(config)
 
 # =============================================================================
 # CONFIGURATION EXPORT/IMPORT
@@ -557,38 +655,96 @@ def export_config() -> Dict[str, Any]:
     """Export current configuration for backup or sharing"""
     
     return {
-        "model_configs": MODEL_CONFIGS,
-        "prompt_configs": PROMPT_CONFIGS,
-        "custom_prompts": CUSTOM_PROMPTS,
-        "language_variations": LANGUAGE_VARIATIONS,
-        "performance_thresholds": PERFORMANCE_THRESHOLDS,
-        "task_optimizations": TASK_OPTIMIZATIONS,
-        "fallback_configs": FALLBACK_CONFIGS,
-        "quality_control": QUALITY_CONTROL,
-        "monitoring_config": MONITORING_CONFIG
+        "model_configs": dict(MODEL_CONFIGS),
+        "prompt_configs": dict(PROMPT_CONFIGS),
+        "custom_prompts": dict(CUSTOM_PROMPTS),
+        "language_variations": _thaw(LANGUAGE_VARIATIONS),
+        "performance_thresholds": _thaw(PERFORMANCE_THRESHOLDS),
+        "task_optimizations": _thaw(TASK_OPTIMIZATIONS),
+        "fallback_configs": _thaw(FALLBACK_CONFIGS),
+        "quality_control": _thaw(QUALITY_CONTROL),
+        "monitoring_config": _thaw(MONITORING_CONFIG)
     }
 
+def _coerce_config_entries(section: str, entries: Any, config_cls: type) -> Dict[str, Any]:
+    """Validate one imported section, accepting config instances or mappings of their fields"""
+    
+    if not isinstance(entries, Mapping):
+        raise ValueError(f"{section} must be a mapping of task name to configuration")
+    
+    coerced = {}
+    for task_type, config in entries.items():
+        if isinstance(config, config_cls):
+            coerced[task_type] = config
+        elif isinstance(config, Mapping):
+            try:
+                coerced[task_type] = config_cls(**config)
+            except TypeError as e:
+                raise ValueError(f"{section}.{task_type}: {e}") from None
+        else:
+            raise ValueError(f"{section}.{task_type} must be a {config_cls.__name__} or a mapping")
+    return coerced
+
+def _validate_custom_prompts(entries: Any) -> Dict[str, Dict[str, str]]:
+    """Validate imported custom prompts, each a mapping with string 'system' and 'user' templates"""
+    
+    if not isinstance(entries, Mapping):
+        raise ValueError("custom_prompts must be a mapping of prompt name to prompt")
+    
+    for name, prompt in entries.items():
+        if not isinstance(prompt, Mapping) or not all(
+            isinstance(prompt.get(key), str) for key in ("system", "user")
+        ):
+            raise ValueError(f"custom_prompts.{name} must have string 'system' and 'user' templates")
+    return {name: dict(prompt) for name, prompt in entries.items()}
+
 def import_config(config_data: Dict[str, Any]) -> bool:
-    """Import configuration from external source"""
+    """Import configuration from external source
+    
+    Every section is validated before anything is applied, so a bad import leaves
+    the current configuration untouched.
+    
+    The read-only tables are replaced by rebinding the module globals, so names bound
+    with "from prompt_config import MODEL_CONFIGS" keep the old table. Read through
+    get_config and render_custom_prompt, which always see the current tables.
+    """
+    
+    global MODEL_CONFIGS, PROMPT_CONFIGS, CUSTOM_PROMPTS, _CUSTOM_PROMPT_PARTS, _FLAT_CONFIGS
     
     try:
-        # Validate and update configurations
-        global MODEL_CONFIGS, PROMPT_CONFIGS, CUSTOM_PROMPTS
+        if not isinstance(config_data, Mapping):
+            raise ValueError("configuration must be a mapping")
+        
+        # Build the merged tables first; the live ones are read-only and are only rebound once all of them validate
+        model_configs, prompt_configs, custom_prompts = MODEL_CONFIGS, PROMPT_CONFIGS, CUSTOM_PROMPTS
         
         if "model_configs" in config_data:
-            MODEL_CONFIGS.update(config_data["model_configs"])
+            model_configs = MappingProxyType({
+                **MODEL_CONFIGS,
+                **_coerce_config_entries("model_configs", config_data["model_configs"], ModelConfig)
+            })
         
         if "prompt_configs" in config_data:
-            PROMPT_CONFIGS.update(config_data["prompt_configs"])
+            prompt_configs = MappingProxyType({
+                **PROMPT_CONFIGS,
+                **_coerce_config_entries("prompt_configs", config_data["prompt_configs"], PromptConfig)
+            })
         
         if "custom_prompts" in config_data:
-            CUSTOM_PROMPTS.update(config_data["custom_prompts"])
-        
-        return True
+            custom_prompts = MappingProxyType({
+                **CUSTOM_PROMPTS,
+                **_validate_custom_prompts(config_data["custom_prompts"])
+            })
+        custom_prompt_parts = _split_user_templates(custom_prompts)
         
-    except Exception as e:
-        print(f"Error importing configuration: {e}")
+    except Exception:
+        logger.exception("Error importing configuration")
         return False
+    
+    MODEL_CONFIGS, PROMPT_CONFIGS, CUSTOM_PROMPTS = model_configs, prompt_configs, custom_prompts
+    _CUSTOM_PROMPT_PARTS = custom_prompt_parts
+    _FLAT_CONFIGS = _build_flat_configs()
+    return True
 
 # =============================================================================
 # EXAMPLE USAGE
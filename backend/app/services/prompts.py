@@ -20,12 +20,130 @@ Usage:
     classification_prompt = prompts.get_classification_prompt(text)
 """
 
-from typing import Dict, List, Optional, Any
+from collections import deque
+from enum import IntEnum
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Any, Tuple, Union
+import atexit
+import functools
 import json
 import logging
+import re
+import textwrap
+import threading
+import time
 
 logger = logging.getLogger(__name__)
 
+@functools.lru_cache(maxsize=64)
+def _template_parts(template: str) -> Tuple[str, str]:
+    """Split a single-slot template around {text} once, so filling it is one join"""
+    before, _, after = template.partition("{text}")
+    return before, after
+
+def _fill_template(template: str, text: str) -> str:
+    before, after = _template_parts(template)
+    return "".join((before, text, after))
+
+@functools.lru_cache(maxsize=16)
+def _sized_template_parts(template: str, target_length: str) -> Tuple[str, str]:
+    """_template_parts for a template whose {target_length} slot takes one of a few fixed values"""
+    return _template_parts(template.replace("{target_length}", target_length))
+
+# {name} slots filled by customize_prompt
+_PROMPT_VARIABLE_RE = re.compile(r"\{([^{}]+)\}")
+
+# Prompt usage records are queued on the request path and logged in batches by a
+# background thread; when the queue is full the oldest records are dropped
+_PROMPT_USAGE_QUEUE: deque = deque(maxlen=10_000)
+_PROMPT_USAGE_BATCH_SIZE = 128
+_PROMPT_USAGE_FLUSH_INTERVAL = 1.0
+_prompt_usage_writer: Optional[threading.Thread] = None
+_prompt_usage_writer_lock = threading.Lock()
+
+def _drain_prompt_usage():
+    """Log every queued prompt usage record, at most _PROMPT_USAGE_BATCH_SIZE per line"""
+    while _PROMPT_USAGE_QUEUE:
+        batch = []
+        try:
+            while len(batch) < _PROMPT_USAGE_BATCH_SIZE:
+                batch.append(_PROMPT_USAGE_QUEUE.popleft())
+        except IndexError:
+            pass
+        if batch:
+            logger.info(f"Prompt usage: {json.dumps(batch)}")
+
+def _write_prompt_usage():
+    while True:
+        time.sleep(_PROMPT_USAGE_FLUSH_INTERVAL)
+        try:
+            _drain_prompt_usage()
+        except Exception as e:
+            logger.debug(f"Prompt usage logging failed: {e}")
+
+def _start_prompt_usage_writer():
+    global _prompt_usage_writer
+    with _prompt_usage_writer_lock:
+        if _prompt_usage_writer is None:
+            _prompt_usage_writer = threading.Thread(
+                target=_write_prompt_usage, name="prompt-usage-log", daemon=True
+            )
+            _prompt_usage_writer.start()
+            atexit.register(_drain_prompt_usage)
+
+# Static lookup tables for the specialized and multi-language prompt builders
+_INFO_TYPES = MappingProxyType({
+    "financial": {
+        "focus": "amounts, dates, payment terms, account numbers, transaction details",
+        "examples": "total amounts, due dates, payment methods, account information"
+    },
+    "legal": {
+        "focus": "parties, obligations, deadlines, legal references, jurisdiction",
+        "examples": "contracting parties, key obligations, important dates, legal citations"
+    },
+    "contact": {
+        "focus": "names, addresses, phone numbers, email addresses, company information",
+        "examples": "contact persons, business addresses, communication details"
+    },
+    "general": {
+        "focus": "key facts, important dates, significant amounts, main parties",
+        "examples": "essential information that someone would need to reference later"
+    }
+})
+
+_COMPARISON_TYPES = MappingProxyType({
+    "differences": "key differences and variations",
+    "similarities": "common elements and shared content", 
+    "changes": "modifications and updates between versions",
+    "general": "similarities, differences, and notable variations"
+})
+
+_LANGUAGE_NAMES = MappingProxyType({
+    'en': 'English',
+    'es': 'Spanish', 
+    'fr': 'French',
+    'de': 'German',
+    'it': 'Italian',
+    'pt': 'Portuguese'
+})
+
+class PromptType(IntEnum):
+    """Prompt types with per-type metadata; values index DocumentPrompts._PROMPT_METADATA"""
+    CLASSIFICATION = 0
+    ENTITY_EXTRACTION = 1
+    SENTIMENT = 2
+    SUMMARIZATION = 3
+    COMBINED_ANALYSIS = 4
+
+_PROMPT_TYPE_BY_NAME = MappingProxyType({prompt_type.name.lower(): prompt_type for prompt_type in PromptType})
+_EMPTY_METADATA: Mapping[str, Any] = MappingProxyType({})
+
+def _resolve_prompt_type(prompt_type) -> Optional[PromptType]:
+    """Map a PromptType or its string name to a PromptType, or None if unknown"""
+    if isinstance(prompt_type, PromptType):
+        return prompt_type
+    return _PROMPT_TYPE_BY_NAME.get(prompt_type)
+
 class DocumentPrompts:
     """
     Centralized prompt management for IntelliDoc AI
@@ -39,9 +157,7 @@ class DocumentPrompts:
     # DOCUMENT CLASSIFICATION PROMPTS
     # =============================================================================
     
-    def get_classification_system_prompt(self) -> str:
-        """System prompt for document classification"""
-        return """You are an expert document classifier specializing in business and legal documents. 
+    _CLASSIFICATION_SYSTEM_PROMPT = """You are an expert document classifier specializing in business and legal documents. 
 
 Your task is to analyze documents and classify them into one of these categories:
 
@@ -80,15 +196,14 @@ Respond with ONLY a JSON object in this exact format:
 • Reasoning should be specific and evidence-based
 • Include 2-5 key indicators that influenced the decision
 • Be conservative with high confidence scores (>0.9)"""
+    
+    def get_classification_system_prompt(self) -> str:
+        """System prompt for document classification"""
+        return self._CLASSIFICATION_SYSTEM_PROMPT
 
-    def get_classification_prompt(self, text: str, max_length: int = 2000) -> str:
-        """Generate classification prompt for document text"""
-        # Truncate text if too long
-        sample_text = text[:max_length] if len(text) > max_length else text
-        
-        prompt = f"""📄 DOCUMENT TO CLASSIFY:
+    _CLASSIFICATION_PROMPT_TEMPLATE = """📄 DOCUMENT TO CLASSIFY:
 
-{sample_text}
+{text}
 
 ---
 
@@ -100,16 +215,19 @@ Analyze the above document and determine its category. Consider:
 4. Target audience and context
 
 Provide classification with confidence score and reasoning."""
+    
+    def get_classification_prompt(self, text: str, max_length: int = 2000) -> str:
+        """Generate classification prompt for document text"""
+        # Truncate text if too long
+        sample_text = self._excerpt(text, max_length)
         
-        return prompt
+        return _fill_template(self._CLASSIFICATION_PROMPT_TEMPLATE, sample_text)
     
     # =============================================================================
     # ENTITY EXTRACTION PROMPTS
     # =============================================================================
     
-    def get_entity_extraction_system_prompt(self) -> str:
-        """System prompt for named entity recognition"""
-        return """You are an expert in Named Entity Recognition (NER) specializing in business and legal documents.
+    _ENTITY_EXTRACTION_SYSTEM_PROMPT = """You are an expert in Named Entity Recognition (NER) specializing in business and legal documents.
 
 Your task is to identify and extract important entities from text.
 
@@ -148,14 +266,14 @@ Respond with ONLY a JSON array of entities in this exact format:
 • Confidence should reflect extraction certainty
 • Include context for ambiguous entities
 • Ensure entity text exactly matches document text"""
+    
+    def get_entity_extraction_system_prompt(self) -> str:
+        """System prompt for named entity recognition"""
+        return self._ENTITY_EXTRACTION_SYSTEM_PROMPT
 
-    def get_entity_extraction_prompt(self, text: str, max_length: int = 1500) -> str:
-        """Generate entity extraction prompt for document text"""
-        sample_text = text[:max_length] if len(text) > max_length else text
-        
-        prompt = f"""📄 DOCUMENT FOR ENTITY EXTRACTION:
+    _ENTITY_EXTRACTION_PROMPT_TEMPLATE = """📄 DOCUMENT FOR ENTITY EXTRACTION:
 
-{sample_text}
+{text}
 
 ---
 
@@ -167,16 +285,18 @@ Extract all important named entities from the above text. Focus on:
 4. Context-specific terms and references
 
 Provide entities with their categories and confidence scores."""
+    
+    def get_entity_extraction_prompt(self, text: str, max_length: int = 1500) -> str:
+        """Generate entity extraction prompt for document text"""
+        sample_text = text[:max_length]
         
-        return prompt
+        return _fill_template(self._ENTITY_EXTRACTION_PROMPT_TEMPLATE, sample_text)
     
     # =============================================================================
     # SENTIMENT ANALYSIS PROMPTS
     # =============================================================================
     
-    def get_sentiment_system_prompt(self) -> str:
-        """System prompt for sentiment analysis"""
-        return """You are an expert in sentiment analysis specializing in business and formal documents.
+    _SENTIMENT_SYSTEM_PROMPT = """You are an expert in sentiment analysis specializing in business and formal documents.
 
 Your task is to analyze the overall emotional tone and sentiment of documents.
 
@@ -217,14 +337,14 @@ Respond with ONLY a JSON object in this exact format:
 • Marketing materials lean positive
 • Complaint documents are typically negative
 • Financial reports are usually neutral/factual"""
+    
+    def get_sentiment_system_prompt(self) -> str:
+        """System prompt for sentiment analysis"""
+        return self._SENTIMENT_SYSTEM_PROMPT
 
-    def get_sentiment_prompt(self, text: str, max_length: int = 1000) -> str:
-        """Generate sentiment analysis prompt for document text"""
-        sample_text = text[:max_length] if len(text) > max_length else text
-        
-        prompt = f"""📄 DOCUMENT FOR SENTIMENT ANALYSIS:
+    _SENTIMENT_PROMPT_TEMPLATE = """📄 DOCUMENT FOR SENTIMENT ANALYSIS:
 
-{sample_text}
+{text}
 
 ---
 
@@ -236,16 +356,18 @@ Analyze the emotional tone and sentiment of the above text. Consider:
 4. Context and document purpose
 
 Determine sentiment category with confidence and supporting evidence."""
+    
+    def get_sentiment_prompt(self, text: str, max_length: int = 1000) -> str:
+        """Generate sentiment analysis prompt for document text"""
+        sample_text = self._excerpt(text, max_length)
         
-        return prompt
+        return _fill_template(self._SENTIMENT_PROMPT_TEMPLATE, sample_text)
     
     # =============================================================================
     # SUMMARIZATION PROMPTS
     # =============================================================================
     
-    def get_summarization_system_prompt(self) -> str:
-        """System prompt for document summarization"""
-        return """You are an expert document summarizer specializing in creating concise, accurate summaries.
+    _SUMMARIZATION_SYSTEM_PROMPT = """You are an expert document summarizer specializing in creating concise, accurate summaries.
 
 Your task is to create clear, informative summaries that capture the essential information.
 
@@ -279,11 +401,31 @@ Provide ONLY the summary text without additional formatting or explanations.
 • Professional tone appropriate to document type
 • Include specific details when important
 • Avoid generic or vague statements"""
+    
+    def get_summarization_system_prompt(self) -> str:
+        """System prompt for document summarization"""
+        return self._SUMMARIZATION_SYSTEM_PROMPT
+
+    _SUMMARIZATION_PROMPT_TEMPLATE = """📄 DOCUMENT TO SUMMARIZE:
+
+{text}
+
+---
+
+🔍 SUMMARIZATION TASK:
+Create a comprehensive summary of the above document. Your summary should:
+1. Capture the main purpose and key information
+2. Include important specifics (dates, amounts, names, etc.)
+3. Maintain the professional tone of the original
+4. Be approximately {target_length}
 
+Focus on what a reader needs to know to understand the document's content and significance."""
+    
     def get_summarization_prompt(self, text: str, max_length: int = 3000) -> str:
         """Generate summarization prompt for document text"""
-        sample_text = text[:max_length] if len(text) > max_length else text
-        word_count = len(text.split())
+        sample_text = text[:max_length]
+        # Only picks one of four buckets, so count separators instead of splitting the whole document
+        word_count = text.count(" ") + 1
         
         # Determine target summary length based on input length
         if word_count < 100:
@@ -295,22 +437,83 @@ Provide ONLY the summary text without additional formatting or explanations.
         else:
             target_length = "2-3 paragraphs (100-150 words)"
         
-        prompt = f"""📄 DOCUMENT TO SUMMARIZE:
+        before, after = _sized_template_parts(self._SUMMARIZATION_PROMPT_TEMPLATE, target_length)
+        return "".join((before, sample_text, after))
+    
+    # =============================================================================
+    # COMBINED ANALYSIS PROMPTS
+    # =============================================================================
+    
+    _COMBINED_ANALYSIS_SYSTEM_PROMPT = """You are an expert document analyst specializing in business and legal documents.
 
-{sample_text}
+Your task is to analyze a document in a single pass: classify it, extract its named entities, assess its sentiment and summarize it.
 
----
+📋 DOCUMENT TYPES:
+invoice, contract, report, letter, resume, legal, academic, technical, form, financial, unknown
 
-🔍 SUMMARIZATION TASK:
-Create a comprehensive summary of the above document. Your summary should:
-1. Capture the main purpose and key information
-2. Include important specifics (dates, amounts, names, etc.)
-3. Maintain the professional tone of the original
-4. Be approximately {target_length}
+🏷️ ENTITY CATEGORIES:
+PERSON, ORG, LOC, DATE, MONEY, PHONE, EMAIL, URL, ID, MISC
 
-Focus on what a reader needs to know to understand the document's content and significance."""
+😊 SENTIMENT CATEGORIES:
+positive, negative, neutral, mixed
+
+📤 RESPONSE FORMAT:
+Respond with ONLY a JSON object in this exact format:
+{
+    "classification": {
+        "type": "document_category",
+        "confidence": 0.95,
+        "reasoning": "Brief explanation of classification decision",
+        "secondary_type": "alternative_category_if_applicable",
+        "key_indicators": ["term1", "term2", "term3"]
+    },
+    "entities": [
+        {
+            "text": "entity_text_as_it_appears",
+            "label": "ENTITY_CATEGORY",
+            "confidence": 0.95,
+            "context": "surrounding_context_if_helpful"
+        }
+    ],
+    "sentiment": {
+        "sentiment": "positive|negative|neutral|mixed",
+        "confidence": 0.85,
+        "reasoning": "Explanation of sentiment determination",
+        "key_phrases": ["phrase1", "phrase2"],
+        "intensity": "low|medium|high",
+        "subjectivity": 0.75
+    },
+    "summary": "Concise summary of the document"
+}
+
+🔍 QUALITY REQUIREMENTS:
+• Confidence values should reflect actual certainty (0.0-1.0)
+• Maximum 20 entities, with text exactly matching the document
+• Summary must only contain information present in the document
+• Include important specifics (dates, amounts, names) in the summary"""
+    
+    def get_combined_analysis_system_prompt(self) -> str:
+        """System prompt for single-pass classification, entities, sentiment and summary"""
+        return self._COMBINED_ANALYSIS_SYSTEM_PROMPT
+
+    _COMBINED_ANALYSIS_PROMPT_TEMPLATE = """📄 DOCUMENT TO ANALYZE:
+
+{text}
+
+---
+
+🔍 ANALYSIS TASK:
+Analyze the above document and return one JSON object containing:
+1. classification - document category with confidence and reasoning
+2. entities - the important named entities with labels and confidence
+3. sentiment - overall tone with confidence and supporting phrases
+4. summary - a concise summary capturing the key information"""
+    
+    def get_combined_analysis_prompt(self, text: str, max_length: int = 3000) -> str:
+        """Generate single-pass analysis prompt for document text"""
+        sample_text = self._excerpt(text, max_length)
         
-        return prompt
+        return _fill_template(self._COMBINED_ANALYSIS_PROMPT_TEMPLATE, sample_text)
     
     # =============================================================================
     # SPECIALIZED TASK PROMPTS
@@ -319,26 +522,7 @@ Focus on what a reader needs to know to understand the document's content and si
     def get_key_information_extraction_prompt(self, text: str, info_type: str = "general") -> str:
         """Generate prompt for extracting specific types of key information"""
         
-        info_types = {
-            "financial": {
-                "focus": "amounts, dates, payment terms, account numbers, transaction details",
-                "examples": "total amounts, due dates, payment methods, account information"
-            },
-            "legal": {
-                "focus": "parties, obligations, deadlines, legal references, jurisdiction",
-                "examples": "contracting parties, key obligations, important dates, legal citations"
-            },
-            "contact": {
-                "focus": "names, addresses, phone numbers, email addresses, company information",
-                "examples": "contact persons, business addresses, communication details"
-            },
-            "general": {
-                "focus": "key facts, important dates, significant amounts, main parties",
-                "examples": "essential information that someone would need to reference later"
-            }
-        }
-        
-        info_config = info_types.get(info_type, info_types["general"])
+        info_config = _INFO_TYPES.get(info_type, _INFO_TYPES["general"])
         
         system_prompt = f"""Extract key {info_type} information from the document.
 
@@ -360,20 +544,9 @@ Provide structured data in JSON format with appropriate field names."""
         
         return prompt
     
-    def get_question_answering_prompt(self, text: str, question: str) -> str:
-        """Generate prompt for answering questions about document content"""
-        
-        system_prompt = """You are a document analysis expert. Answer questions about document content accurately and concisely.
+    _QUESTION_ANSWERING_PROMPT_TEMPLATE = """📄 DOCUMENT:
 
-GUIDELINES:
-• Only use information present in the document
-• If information is not available, state "Information not found in document"
-• Provide specific quotes or references when possible
-• Be precise and factual in your responses"""
-        
-        prompt = f"""📄 DOCUMENT:
-
-{text[:2500]}
+{text}
 
 ---
 
@@ -382,28 +555,27 @@ GUIDELINES:
 🔍 TASK:
 Answer the question based solely on the information provided in the document above. 
 If the answer is not explicitly stated in the document, indicate that the information is not available."""
-        
-        return prompt
     
-    def get_document_comparison_prompt(self, doc1: str, doc2: str, comparison_type: str = "general") -> str:
-        """Generate prompt for comparing two documents"""
-        
-        comparison_types = {
-            "differences": "key differences and variations",
-            "similarities": "common elements and shared content", 
-            "changes": "modifications and updates between versions",
-            "general": "similarities, differences, and notable variations"
-        }
+    def get_question_answering_prompt(self, text: str, question: str) -> str:
+        """Generate prompt for answering questions about document content"""
         
-        focus = comparison_types.get(comparison_type, comparison_types["general"])
+        system_prompt = """You are a document analysis expert. Answer questions about document content accurately and concisely.
+
+GUIDELINES:
+• Only use information present in the document
+• If information is not available, state "Information not found in document"
+• Provide specific quotes or references when possible
+• Be precise and factual in your responses"""
         
-        prompt = f"""📄 DOCUMENT 1:
+        return self._QUESTION_ANSWERING_PROMPT_TEMPLATE.format_map({'text': text[:2500], 'question': question})
+    
+    _DOCUMENT_COMPARISON_PROMPT_TEMPLATE = """📄 DOCUMENT 1:
 
-{doc1[:1500]}
+{doc1}
 
 📄 DOCUMENT 2:
 
-{doc2[:1500]}
+{doc2}
 
 ---
 
@@ -415,8 +587,13 @@ Provide a structured analysis highlighting:
 2. Important differences  
 3. Notable changes or variations
 4. Overall relationship between documents"""
+    
+    def get_document_comparison_prompt(self, doc1: str, doc2: str, comparison_type: str = "general") -> str:
+        """Generate prompt for comparing two documents"""
         
-        return prompt
+        focus = _COMPARISON_TYPES.get(comparison_type, _COMPARISON_TYPES["general"])
+        
+        return self._DOCUMENT_COMPARISON_PROMPT_TEMPLATE.format_map({'doc1': doc1[:1500], 'doc2': doc2[:1500], 'focus': focus})
     
     # =============================================================================
     # MULTI-LANGUAGE SUPPORT
@@ -424,7 +601,7 @@ Provide a structured analysis highlighting:
     
     def get_language_detection_prompt(self, text: str) -> str:
         """Generate prompt for language detection"""
-        sample_text = text[:500] if len(text) > 500 else text
+        sample_text = text[:500]
         
         prompt = f"""Identify the primary language of this text:
 
@@ -437,16 +614,7 @@ Respond with only the ISO 639-1 language code (e.g., 'en', 'es', 'fr', 'de', 'it
     def get_translation_prompt(self, text: str, target_language: str) -> str:
         """Generate prompt for document translation"""
         
-        language_names = {
-            'en': 'English',
-            'es': 'Spanish', 
-            'fr': 'French',
-            'de': 'German',
-            'it': 'Italian',
-            'pt': 'Portuguese'
-        }
-        
-        target_lang_name = language_names.get(target_language, target_language)
+        target_lang_name = _LANGUAGE_NAMES.get(target_language, target_language)
         
         prompt = f"""Translate the following document content to {target_lang_name}.
 
@@ -475,10 +643,13 @@ Provide the translation in {target_lang_name}:"""
         
         custom_prompt = base_prompt
         
-        # Apply variable substitutions
-        if 'variables' in customizations:
-            for var, value in customizations['variables'].items():
-                custom_prompt = custom_prompt.replace(f"{{{var}}}", str(value))
+        # Apply variable substitutions in one pass; unknown slots are left as they are
+        variables = customizations.get('variables')
+        if variables:
+            custom_prompt = _PROMPT_VARIABLE_RE.sub(
+                lambda match: str(variables[match.group(1)]) if match.group(1) in variables else match.group(0),
+                custom_prompt
+            )
         
         # Add custom instructions
         if 'additional_instructions' in customizations:
@@ -490,47 +661,67 @@ Provide the translation in {target_lang_name}:"""
         
         return custom_prompt
     
-    def get_prompt_metadata(self, prompt_type: str) -> Dict[str, Any]:
-        """Get metadata about a specific prompt type"""
-        
-        metadata = {
-            "classification": {
-                "description": "Classifies documents into predefined categories",
-                "input_requirements": ["document_text"],
-                "output_format": "JSON with type, confidence, reasoning",
-                "max_input_length": 2000,
-                "typical_response_time": "2-5 seconds"
-            },
-            "entity_extraction": {
-                "description": "Extracts named entities from document text",
-                "input_requirements": ["document_text"],
-                "output_format": "JSON array of entities with labels",
-                "max_input_length": 1500,
-                "typical_response_time": "3-7 seconds"
-            },
-            "sentiment": {
-                "description": "Analyzes emotional tone and sentiment",
-                "input_requirements": ["document_text"],
-                "output_format": "JSON with sentiment, confidence, reasoning",
-                "max_input_length": 1000,
-                "typical_response_time": "2-4 seconds"
-            },
-            "summarization": {
-                "description": "Creates concise summaries of document content",
-                "input_requirements": ["document_text"],
-                "output_format": "Plain text summary",
-                "max_input_length": 3000,
-                "typical_response_time": "5-10 seconds"
-            }
-        }
-        
-        return metadata.get(prompt_type, {})
+    # Indexed by PromptType; entries are read-only since get_prompt_metadata hands them out shared
+    _PROMPT_METADATA = (
+        # PromptType.CLASSIFICATION
+        MappingProxyType({
+            "description": "Classifies documents into predefined categories",
+            "input_requirements": ("document_text",),
+            "output_format": "JSON with type, confidence, reasoning",
+            "max_input_length": 2000,
+            "typical_response_time": "2-5 seconds"
+        }),
+        # PromptType.ENTITY_EXTRACTION
+        MappingProxyType({
+            "description": "Extracts named entities from document text",
+            "input_requirements": ("document_text",),
+            "output_format": "JSON array of entities with labels",
+            "max_input_length": 1500,
+            "typical_response_time": "3-7 seconds"
+        }),
+        # PromptType.SENTIMENT
+        MappingProxyType({
+            "description": "Analyzes emotional tone and sentiment",
+            "input_requirements": ("document_text",),
+            "output_format": "JSON with sentiment, confidence, reasoning",
+            "max_input_length": 1000,
+            "typical_response_time": "2-4 seconds"
+        }),
+        # PromptType.SUMMARIZATION
+        MappingProxyType({
+            "description": "Creates concise summaries of document content",
+            "input_requirements": ("document_text",),
+            "output_format": "Plain text summary",
+            "max_input_length": 3000,
+            "typical_response_time": "5-10 seconds"
+        }),
+        # PromptType.COMBINED_ANALYSIS
+        MappingProxyType({
+            "description": "Classifies, extracts entities, analyzes sentiment and summarizes in one pass",
+            "input_requirements": ("document_text",),
+            "output_format": "JSON with classification, entities, sentiment, summary",
+            "max_input_length": 3000,
+            "typical_response_time": "6-12 seconds"
+        })
+    )
     
-    def validate_prompt_input(self, prompt_type: str, input_text: str) -> Dict[str, Any]:
+    def get_prompt_metadata(self, prompt_type: Union[PromptType, str]) -> Mapping[str, Any]:
+        """Get read-only metadata about a specific prompt type"""
+        resolved = _resolve_prompt_type(prompt_type)
+        return self._PROMPT_METADATA[resolved] if resolved is not None else _EMPTY_METADATA
+    
+    def validate_prompt_input(self, prompt_type: Union[PromptType, str], input_text: str) -> Dict[str, Any]:
         """Validate input for a specific prompt type"""
         
-        metadata = self.get_prompt_metadata(prompt_type)
-        max_length = metadata.get("max_input_length", 2000)
+        if not input_text:
+            return {
+                "valid": False,
+                "warnings": ["Input text is very short. Results may be limited."],
+                "errors": ["Input text is empty"],
+                "suggestions": []
+            }
+        
+        max_length = self.get_prompt_metadata(prompt_type).get("max_input_length", 2000)
         
         validation_result = {
             "valid": True,
@@ -540,10 +731,6 @@ Provide the translation in {target_lang_name}:"""
         }
         
         # Check text length
-        if len(input_text) == 0:
-            validation_result["valid"] = False
-            validation_result["errors"].append("Input text is empty")
-        
         if len(input_text) > max_length:
             validation_result["warnings"].append(f"Input text ({len(input_text)} chars) exceeds recommended length ({max_length} chars). Text will be truncated.")
         
@@ -557,42 +744,50 @@ Provide the translation in {target_lang_name}:"""
         
         return validation_result
     
+    def _excerpt(self, text: str, max_length: int, tail_ratio: float = 0.25) -> str:
+        """Fit text into max_length as a head plus tail excerpt, keeping closing sections in view"""
+        if len(text) <= max_length:
+            return text
+        
+        tail = int(max_length * tail_ratio)
+        return text[:max_length - tail] + "\n...\n" + text[-tail:]
+    
     # =============================================================================
     # QUALITY CONTROL AND TESTING
     # =============================================================================
     
 
     
-    def log_prompt_usage(self, prompt_type: str, input_length: int, response_time: Optional[float] = None):
-        """Log prompt usage for monitoring and optimization"""
+    def log_prompt_usage(self, prompt_type: Union[PromptType, str], input_length: int, response_time: Optional[float] = None):
+        """Queue prompt usage for monitoring and optimization; records are logged in batches"""
+        
+        if not logger.isEnabledFor(logging.INFO):
+            return
         
         log_data = {
-            "prompt_type": prompt_type,
+            "prompt_type": prompt_type.name.lower() if isinstance(prompt_type, PromptType) else prompt_type,
             "input_length": input_length,
-            "timestamp": "auto-generated",
+            "timestamp": time.time(),
             "version": self.version
         }
         
         if response_time:
             log_data["response_time"] = response_time
         
-        logger.info(f"Prompt usage: {json.dumps(log_data)}")
+        _PROMPT_USAGE_QUEUE.append(log_data)
+        if _prompt_usage_writer is None:
+            _start_prompt_usage_writer()
 
 # =============================================================================
 # PROMPT TEMPLATES FOR SPECIFIC DOCUMENT TYPES
 # =============================================================================
 
-class SpecializedPrompts:
-    """Specialized prompts for specific document types"""
-    
-    @staticmethod
-    def get_invoice_analysis_prompt(text: str) -> str:
-        """Specialized prompt for invoice analysis"""
-        return f"""
+# Specialized prompt templates, dedented once so indentation is not sent to the model
+_INVOICE_ANALYSIS_TEMPLATE = textwrap.dedent("""
         Analyze this invoice and extract key information:
         
         📄 INVOICE DOCUMENT:
-        {text[:2000]}
+        {text}
         
         🔍 EXTRACT:
         • Invoice number and date
@@ -602,16 +797,13 @@ class SpecializedPrompts:
         • Payment terms and due date
         
         Return as structured JSON with invoice-specific fields.
-        """
-    
-    @staticmethod
-    def get_contract_analysis_prompt(text: str) -> str:
-        """Specialized prompt for contract analysis"""
-        return f"""
+        """).strip()
+
+_CONTRACT_ANALYSIS_TEMPLATE = textwrap.dedent("""
         Analyze this contract and identify key elements:
         
         📄 CONTRACT DOCUMENT:
-        {text[:2500]}
+        {text}
         
         🔍 EXTRACT:
         • Contracting parties
@@ -622,16 +814,13 @@ class SpecializedPrompts:
         • Termination clauses
         
         Return as structured JSON with contract-specific fields.
-        """
-    
-    @staticmethod
-    def get_resume_analysis_prompt(text: str) -> str:
-        """Specialized prompt for resume/CV analysis"""
-        return f"""
+        """).strip()
+
+_RESUME_ANALYSIS_TEMPLATE = textwrap.dedent("""
         Analyze this resume/CV and extract professional information:
         
         📄 RESUME/CV DOCUMENT:
-        {text[:2000]}
+        {text}
         
         🔍 EXTRACT:
         • Personal information (name, contact)
@@ -641,6 +830,40 @@ class SpecializedPrompts:
         • Certifications and achievements
         
         Return as structured JSON with resume-specific fields.
-        """
+        """).strip()
+
+# Document type -> (template, max text length) for the specialized analysis prompts
+_SPECIALIZED_ANALYSIS_PROMPTS = MappingProxyType({
+    "invoice": (_INVOICE_ANALYSIS_TEMPLATE, 2000),
+    "contract": (_CONTRACT_ANALYSIS_TEMPLATE, 2500),
+    "resume": (_RESUME_ANALYSIS_TEMPLATE, 2000)
+})
+
+class SpecializedPrompts:
+    """Specialized prompts for specific document types"""
+    
+    @staticmethod
+    def get_analysis_prompt(document_type: str, text: str) -> Optional[str]:
+        """Specialized analysis prompt for document_type, or None if there is no specialized template"""
+        entry = _SPECIALIZED_ANALYSIS_PROMPTS.get(document_type)
+        if entry is None:
+            return None
+        template, max_length = entry
+        return _fill_template(template, text[:max_length])
+    
+    @staticmethod
+    def get_invoice_analysis_prompt(text: str) -> str:
+        """Specialized prompt for invoice analysis"""
+        return SpecializedPrompts.get_analysis_prompt("invoice", text)
+    
+    @staticmethod
+    def get_contract_analysis_prompt(text: str) -> str:
+        """Specialized prompt for contract analysis"""
+        return SpecializedPrompts.get_analysis_prompt("contract", text)
+    
+    @staticmethod
+    def get_resume_analysis_prompt(text: str) -> str:
+        """Specialized prompt for resume/CV analysis"""
+        return SpecializedPrompts.get_analysis_prompt("resume", text)
 
 
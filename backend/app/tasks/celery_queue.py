@@ -4,12 +4,17 @@ Integrates with Redis backend for scalable task management
 """
 
 import logging
-from typing import Dict, Any, Optional
+import uuid
+from typing import Dict, Any, AsyncIterator, List, Optional, Tuple
 from pathlib import Path
+from celery import group
 from celery.result import AsyncResult
 from app.core.celery_app import celery_app
-from app.tasks.celery_tasks import process_document_task, get_task_status_from_redis
-from app.models.schemas import ProcessingStatus
+from app.tasks.celery_tasks import (
+    process_document_task, get_task_status_from_redis, get_all_task_statuses_from_redis,
+    watch_task_status_from_redis, get_download_from_redis, store_download_in_redis,
+    store_pending_task_statuses
+)
 
 logger = logging.getLogger(__name__)
 
@@ -22,13 +27,16 @@ class CeleryTaskQueue:
     async def submit_task(self, file_path: Path, filename: str) -> str:
         """Submit a new document processing task to Celery"""
         try:
+            # Record the task as pending before sending it so its status is always in Redis
+            task_id = str(uuid.uuid4())
+            store_pending_task_statuses([(task_id, filename, str(file_path))])
+            
             # Submit task to Celery
-            result = process_document_task.delay(
-                file_path=str(file_path),
-                filename=filename
+            process_document_task.apply_async(
+                kwargs={'file_path': str(file_path), 'filename': filename},
+                task_id=task_id
             )
             
-            task_id = result.id
             logger.info(f"Celery task {task_id} submitted for file: {filename}")
             return task_id
             
@@ -36,69 +44,64 @@ class CeleryTaskQueue:
             logger.error(f"Failed to submit task for {filename}: {e}")
             raise
     
-    def get_task_status(self, task_id: str) -> Optional[Dict[str, Any]]:
-        """Get the status of a task from Redis and Celery"""
+    async def submit_tasks(self, files: List[Tuple[Path, str]]) -> List[str]:
+        """Submit several document processing tasks to Celery as one group"""
         try:
-            # First try to get from Redis (our custom status)
-            redis_status = get_task_status_from_redis(task_id)
-            if redis_status:
-                return redis_status
+            task_ids = [str(uuid.uuid4()) for _ in files]
+            store_pending_task_statuses([
+                (task_id, filename, str(file_path))
+                for task_id, (file_path, filename) in zip(task_ids, files)
+            ])
             
-            # Fallback to Celery result backend
-            result = AsyncResult(task_id, app=self.celery_app)
+            # A group publishes all messages over one broker connection
+            group(
+                process_document_task.s(file_path=str(file_path), filename=filename).set(task_id=task_id)
+                for task_id, (file_path, filename) in zip(task_ids, files)
+            ).apply_async()
             
-            if result.state == 'PENDING':
-                return {
-                    'id': task_id,
-                    'status': ProcessingStatus.PENDING,
-                    'progress': 0,
-                    'result': None,
-                    'error': None
-                }
-            elif result.state == 'PROGRESS':
-                meta = result.info or {}
-                return {
-                    'id': task_id,
-                    'status': ProcessingStatus.PROCESSING,
-                    'progress': meta.get('progress', 0),
-                    'result': meta.get('result'),
-                    'error': meta.get('error')
-                }
-            elif result.state == 'SUCCESS':
-                return {
-                    'id': task_id,
-                    'status': ProcessingStatus.COMPLETED,
-                    'progress': 100,
-                    'result': result.result,
-                    'error': None
-                }
-            elif result.state == 'FAILURE':
-                return {
-                    'id': task_id,
-                    'status': ProcessingStatus.ERROR,
-                    'progress': 100,
-                    'result': None,
-                    'error': str(result.info)
-                }
-            else:
-                return {
-                    'id': task_id,
-                    'status': result.state,
-                    'progress': 0,
-                    'result': None,
-                    'error': None
-                }
-                
+            logger.info(f"Celery tasks {task_ids} submitted for {len(files)} files")
+            return task_ids
+            
+        except Exception as e:
+            logger.error(f"Failed to submit batch of {len(files)} tasks: {e}")
+            raise
+    
+    def get_task_status(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """Get the status of a task from Redis"""
+        try:
+            # Statuses are stored before tasks are sent, so a miss means the task is
+            # unknown or expired; Celery's result backend would not know more
+            return get_task_status_from_redis(task_id)
         except Exception as e:
             logger.error(f"Failed to get task status for {task_id}: {e}")
             return None
     
+    def watch_task_status(self, task_id: str) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        """Yield a task's status on every change until it finishes; None is a keep-alive tick"""
+        return watch_task_status_from_redis(task_id)
+    
     def get_all_tasks(self) -> Dict[str, Dict[str, Any]]:
-        """Get all active tasks - limited implementation for Celery"""
-        # Note: This is limited with Celery since we can't easily enumerate all tasks
-        # In production, you'd want to maintain a separate registry or use Celery monitoring tools
-        logger.warning("get_all_tasks() has limited functionality with Celery backend")
-        return {}
+        """Get all tasks tracked in Redis"""
+        try:
+            return get_all_task_statuses_from_redis()
+        except Exception as e:
+            logger.error(f"Failed to list tasks: {e}")
+            return {}
+    
+    def get_cached_download(self, task_id: str, format: str) -> Optional[bytes]:
+        """Get a previously rendered download of a task's results"""
+        try:
+            return get_download_from_redis(task_id, format)
+        except Exception as e:
+            logger.warning(f"Failed to read cached {format} download for {task_id}: {e}")
+            return None
+    
+    def cache_download(self, task_id: str, format: str, content: bytes):
+        """Cache a rendered download of a task's results"""
+        try:
+            store_download_in_redis(task_id, format, content)
+        except Exception as e:
+            logger.warning(f"Failed to cache {format} download for {task_id}: {e}")
     
     def cancel_task(self, task_id: str) -> bool:
         """Cancel a running task"""
@@ -5,16 +5,26 @@ Handles asynchronous AI-powered document analysis
 
 import asyncio
 import logging
+import os
+import threading
+import time
 import uuid
+import zlib
 from pathlib import Path
-from typing import Dict, Any, Optional, Callable
+from typing import Dict, Any, AsyncIterator, List, Optional, Callable, Tuple
 from celery import current_task
+from celery.signals import worker_process_init
+import msgpack
+import orjson
 import redis
+import zstandard
+from redis import asyncio as aioredis
 
 from app.core.celery_app import celery_app
 from app.services import PDFService
 from app.services.ollama_ai_service import OllamaAIService
 from app.models.schemas import ProcessingStatus
+from app.utils.cv2_compat import cv2
 from app.config import get_settings
 
 # Configure logging
@@ -24,15 +34,220 @@ logger = logging.getLogger(__name__)
 settings = get_settings()
 redis_client = redis.from_url(settings.REDIS_URL)
 
+# Async client for progress writes made from inside the processing coroutines, so they do not
+# block the worker's event loop; it connects lazily, on that loop
+aioredis_client = aioredis.from_url(settings.REDIS_URL, decode_responses=False)
+
+# HSET the field/value pairs in ARGV[3..], set the expiry in ARGV[1] and publish the event in
+# ARGV[2] to the KEYS[2] channel, atomically in one round-trip; register_script sends EVALSHA
+# and only loads the body when Redis lacks it
+_STORE_TASK_STATUS_SCRIPT = (
+    "redis.call('HSET', KEYS[1], unpack(ARGV, 3)); redis.call('EXPIRE', KEYS[1], ARGV[1]); "
+    "redis.call('PUBLISH', KEYS[2], ARGV[2]); return 1"
+)
+_store_task_status = redis_client.register_script(_STORE_TASK_STATUS_SCRIPT)
+_store_task_status_async = aioredis_client.register_script(_STORE_TASK_STATUS_SCRIPT)
+
+# Persistent per-process event loop, run on a background thread, so async clients and
+# connection pools stay warm across tasks instead of being rebuilt with a fresh loop each time
+_worker_loop: Optional[asyncio.AbstractEventLoop] = None
+_worker_loop_lock = threading.Lock()
+
+def _start_worker_loop() -> asyncio.AbstractEventLoop:
+    global _worker_loop
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, name="task-event-loop", daemon=True).start()
+    _worker_loop = loop
+    return loop
+
+# Worker-scoped services, shared by every task the process runs
+_pdf_service: Optional[PDFService] = None
+_ai_service: Optional[OllamaAIService] = None
+_ai_ready = False
+
+def _get_worker_services() -> Tuple[PDFService, Optional[OllamaAIService]]:
+    """Return the shared PDF service and, if Ollama is reachable, the shared AI service
+    
+    Ollama is probed once per worker; while it is unavailable the probe is retried on
+    later tasks so a model server started after the worker is still picked up.
+    """
+    global _pdf_service, _ai_service, _ai_ready
+    if _pdf_service is None:
+        _pdf_service = PDFService()
+    if _ai_service is None:
+        _ai_service = OllamaAIService()
+    
+    if not _ai_ready:
+        try:
+            _ai_ready = bool(_run_in_worker_loop(_ai_service.initialize_models()))
+            if _ai_ready:
+                logger.info("Ollama AI service initialized successfully")
+            else:
+                logger.warning("Ollama not available, continuing with basic processing")
+        except Exception as e:
+            logger.warning(f"Ollama AI service initialization failed: {e}")
+    
+    return _pdf_service, _ai_service if _ai_ready else None
+
+@worker_process_init.connect
+def _init_worker_process(**kwargs):
+    """Start a fresh loop in each forked worker
+    
+    Services are built by the first task rather than here: Celery kills children whose
+    init handlers run longer than worker_proc_alive_timeout, and the Ollama warm-up can.
+    """
+    # Loop threads do not survive fork
+    with _worker_loop_lock:
+        _start_worker_loop()
+    
+    # Split the cores between worker processes instead of letting each OpenCV use all of them
+    concurrency = celery_app.conf.worker_concurrency or os.cpu_count() or 1
+    cv2.setNumThreads(max(1, (os.cpu_count() or 1) // concurrency))
+
+def _run_in_worker_loop(coro):
+    """Run a coroutine on the worker's persistent event loop and wait for its result"""
+    loop = _worker_loop
+    if loop is None:
+        # Pools that do not fork (solo, threads) never send worker_process_init
+        with _worker_loop_lock:
+            loop = _worker_loop or _start_worker_loop()
+    
+    future = asyncio.run_coroutine_threadsafe(coro, loop)
+    try:
+        return future.result()
+    except BaseException:
+        # E.g. a soft time limit: stop the coroutine instead of leaving it running
+        future.cancel()
+        raise
+
+# Plain progress ticks are written only after advancing this many percent or this many seconds;
+# the UI polls at about 1 Hz, so finer updates only add Redis traffic
+_PROGRESS_MIN_STEP = 5
+_PROGRESS_MIN_INTERVAL = 0.5
+
+def _msgpack_default(obj: Any) -> Any:
+    """Convert numpy scalars and arrays, which msgpack cannot encode natively"""
+    if hasattr(obj, 'tolist'):
+        return obj.tolist()
+    raise TypeError(f"Cannot serialize {type(obj).__name__}")
+
+# Results larger than this are compressed and tagged with a one-byte marker. Uncompressed
+# JSON and msgpack maps never start with these bytes, so untagged values are stored as-is.
+# The zlib marker is only read, for records written before zstandard was a dependency.
+_COMPRESS_THRESHOLD = 4096
+_ZSTD_MARKER = b'\x01'
+_ZLIB_MARKER = b'\x02'
+
+_zstd_compressor = zstandard.ZstdCompressor(level=3)
+_zstd_decompressor = zstandard.ZstdDecompressor()
+
+def _compress(payload: bytes) -> bytes:
+    if len(payload) <= _COMPRESS_THRESHOLD:
+        return payload
+    return _ZSTD_MARKER + _zstd_compressor.compress(payload)
+
+def _decompress(payload: bytes) -> bytes:
+    marker = payload[:1]
+    if marker == _ZSTD_MARKER:
+        return _zstd_decompressor.decompress(payload[1:])
+    if marker == _ZLIB_MARKER:
+        return zlib.decompress(payload[1:])
+    return payload
+
+def _pack_result(result: Dict[str, Any]) -> Tuple[str, bytes]:
+    """Serialize a result for Redis, returning the hash field to store it under"""
+    return 'result_mp', _compress(msgpack.packb(result, use_bin_type=True, default=_msgpack_default))
+
+def _unpack_result(field: str, value: bytes) -> Any:
+    """Deserialize a result stored by _pack_result; records written as JSON before the switch to msgpack still load"""
+    try:
+        value = _decompress(value)
+    except Exception as e:
+        logger.warning(f"Failed to decompress stored result: {e}")
+    if field == 'result_mp':
+        try:
+            return msgpack.unpackb(value, raw=False, strict_map_key=False)
+        except Exception:
+            pass
+    try:
+        return orjson.loads(value)
+    except orjson.JSONDecodeError:
+        return value.decode('utf-8', 'replace') if isinstance(value, bytes) else value
+
+# Fields published to task_events:<task_id> on every status write
+_TASK_EVENT_FIELDS = frozenset(('filename', 'status', 'progress', 'error'))
+_TERMINAL_STATUSES = frozenset((ProcessingStatus.COMPLETED.value, ProcessingStatus.ERROR.value))
+
 class TaskProgressTracker:
     """Helper class to track and update task progress"""
     
     def __init__(self, task_id: str):
         self.task_id = task_id
         self.redis_key = f"task_status:{task_id}"
+        self._script_keys = [self.redis_key, f"task_events:{task_id}"]
+        self._last_written_pct = -_PROGRESS_MIN_STEP
+        self._last_written_ts = 0.0
+        # Progress queued from the event loop; only the latest pending update is kept
+        self._pending_progress: Optional[int] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        # Celery's current task is thread-local, so capture it for reports made from the loop thread
+        self._celery_task = current_task._get_current_object() if current_task else None
+        self._celery_task_id = self._celery_task.request.id if self._celery_task else None
     
     def update_progress(self, progress: int, status: Optional[str] = None, result: Optional[Dict] = None, error: Optional[str] = None):
         """Update task progress in Redis"""
+        # Status changes, results, errors and completion are always written
+        if not self._due(progress, force=bool(status or result or error)):
+            return
+        
+        self._store(self._task_data(progress, status, result, error))
+        self._report(progress, status, result, error)
+    
+    def queue_progress(self, progress: int):
+        """Update task progress from a coroutine running on the event loop without blocking it
+        
+        Writes run on a background task; updates queued while one is in flight are coalesced.
+        Await flush() before writing a final status so it is not overtaken by a queued update.
+        """
+        if not self._due(progress):
+            return
+        
+        self._pending_progress = progress
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.get_running_loop().create_task(self._write_pending_progress())
+    
+    async def flush(self):
+        """Wait for progress queued by queue_progress to be written"""
+        if self._flush_task is not None:
+            await asyncio.gather(self._flush_task, return_exceptions=True)
+    
+    async def _write_pending_progress(self):
+        while self._pending_progress is not None:
+            progress, self._pending_progress = self._pending_progress, None
+            try:
+                await _store_task_status_async(keys=self._script_keys, args=self._script_args(self._task_data(progress)))
+                await asyncio.to_thread(self._report, progress)
+            except Exception as e:
+                logger.warning(f"Failed to write progress for task {self.task_id}: {e}")
+    
+    def _due(self, progress: int, force: bool = False) -> bool:
+        """Whether a progress update should be written, recording it if so"""
+        now = time.monotonic()
+        if (not force and progress < 100 and progress - self._last_written_pct < _PROGRESS_MIN_STEP
+                and now - self._last_written_ts <= _PROGRESS_MIN_INTERVAL):
+            return False
+        
+        self._last_written_pct = progress
+        self._last_written_ts = now
+        return True
+    
+    def _init_and_update(self, initial_data: Dict[str, Any], progress: int, status: Optional[str] = None):
+        """Store the initial task info and the first progress update in one round-trip"""
+        self._due(progress, force=True)
+        self._store(initial_data, self._task_data(progress, status))
+        self._report(progress, status)
+    
+    def _task_data(self, progress: int, status: Optional[str] = None, result: Optional[Dict] = None, error: Optional[str] = None) -> Dict[str, Any]:
         task_data = {
             'id': self.task_id,
             'progress': str(min(progress, 100)),
@@ -41,18 +256,37 @@ class TaskProgressTracker:
         if status:
             task_data['status'] = status
         if result:
-            import json
-            task_data['result'] = json.dumps(result)  # JSON serialize for Redis
+            field, payload = _pack_result(result)
+            task_data[field] = payload
         if error:
             task_data['error'] = error
-            
-        # Store in Redis with 1 hour expiry
-        redis_client.hset(self.redis_key, mapping=task_data)
-        redis_client.expire(self.redis_key, 3600)
+        return task_data
+    
+    def _store(self, *mappings: Dict[str, Any]):
+        """Write the mappings and refresh the 1 hour expiry in a single round-trip"""
+        _store_task_status(keys=self._script_keys, args=self._script_args(*mappings))
+    
+    def _script_args(self, *mappings: Dict[str, Any]) -> List[Any]:
+        # The published event carries everything but the (possibly large) result
+        event = {'id': self.task_id}
+        args = [3600, b'']
+        for mapping in mappings:
+            for field, value in mapping.items():
+                args.append(field)
+                args.append(value)
+                if field in _TASK_EVENT_FIELDS:
+                    event[field] = value
         
-        # Update Celery task meta
-        if current_task:
-            current_task.update_state(
+        event['progress'] = int(event.get('progress', 0))
+        event['error'] = event.get('error') or None
+        args[1] = orjson.dumps(event)
+        return args
+    
+    def _report(self, progress: int, status: Optional[str] = None, result: Optional[Dict] = None, error: Optional[str] = None):
+        """Update Celery task meta"""
+        if self._celery_task is not None:
+            self._celery_task.update_state(
+                task_id=self._celery_task_id,
                 state=status or 'PROGRESS',
                 meta={
                     'progress': progress,
@@ -63,6 +297,32 @@ class TaskProgressTracker:
         
         logger.debug(f"Task {self.task_id} progress: {progress}%")
 
+def _initial_task_data(task_id: str, filename: str, file_path: str) -> Dict[str, Any]:
+    return {
+        'id': task_id,
+        'filename': filename,
+        'file_path': file_path,
+        'status': ProcessingStatus.PENDING,
+        'progress': '0',
+        'result': '',
+        'error': ''
+    }
+
+def store_pending_task_statuses(tasks: List[Tuple[str, str, str]]):
+    """Store PENDING statuses for (task_id, filename, file_path) tasks in one round-trip
+    
+    Called before the tasks are sent, so a status exists in Redis for every submitted task.
+    """
+    pipe = redis_client.pipeline(transaction=False)
+    for task_id, filename, file_path in tasks:
+        tracker = TaskProgressTracker(task_id)
+        _store_task_status(
+            keys=tracker._script_keys,
+            args=tracker._script_args(_initial_task_data(task_id, filename, file_path)),
+            client=pipe
+        )
+    pipe.execute()
+
 def get_task_status_from_redis(task_id: str) -> Optional[Dict[str, Any]]:
     """Get task status from Redis"""
     redis_key = f"task_status:{task_id}"
@@ -71,25 +331,98 @@ def get_task_status_from_redis(task_id: str) -> Optional[Dict[str, Any]]:
     if not task_data:
         return None
     
-    # Convert bytes to strings and handle data types
-    result = {}
-    for k, v in task_data.items():
-        key = k.decode() if isinstance(k, bytes) else k
-        value = v.decode() if isinstance(v, bytes) else v
+    return _decode_task_status(task_data)
+
+async def watch_task_status_from_redis(task_id: str, heartbeat: float = 15.0) -> AsyncIterator[Optional[Dict[str, Any]]]:
+    """Yield a task's status now and after every change, until it completes or fails
+    
+    Changes arrive over the task_events pub/sub channel instead of by polling the hash;
+    the full hash, including the result, is only re-read once the task finishes. None is
+    yielded after heartbeat seconds without a change so callers can keep connections alive.
+    """
+    pubsub = aioredis_client.pubsub()
+    # Subscribe before reading the current status so no change is missed in between
+    await pubsub.subscribe(f"task_events:{task_id}")
+    try:
+        task_data = await aioredis_client.hgetall(f"task_status:{task_id}")
+        status = _decode_task_status(task_data) if task_data else None
+        if status is not None:
+            yield status
+            if status.get('status') in _TERMINAL_STATUSES:
+                return
         
-        # Convert specific fields back to appropriate types
-        if key == 'progress':
-            result[key] = int(value) if value else 0
-        elif key == 'result' and value:
-            try:
-                import json
-                result[key] = json.loads(value)
-            except:
-                result[key] = value
-        elif key in ['error', 'result'] and not value:
-            result[key] = None
-        else:
-            result[key] = value
+        while True:
+            message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=heartbeat)
+            if message is None:
+                yield None
+                continue
+            
+            event = orjson.loads(message['data'])
+            if event.get('status') in _TERMINAL_STATUSES:
+                task_data = await aioredis_client.hgetall(f"task_status:{task_id}")
+                yield _decode_task_status(task_data) if task_data else event
+                return
+            
+            status = {**status, **event} if status else event
+            yield status
+    finally:
+        await pubsub.unsubscribe()
+        await pubsub.aclose()
+
+def get_download_from_redis(task_id: str, format: str) -> Optional[bytes]:
+    """Get a cached rendered download of a task's results"""
+    blob = redis_client.get(f"task_download:{task_id}:{format}")
+    return _decompress(blob) if blob is not None else None
+
+def store_download_in_redis(task_id: str, format: str, content: bytes):
+    """Cache a rendered download; results are immutable once a task completes"""
+    redis_client.set(f"task_download:{task_id}:{format}", _compress(content), ex=3600)
+
+def get_all_task_statuses_from_redis(batch_size: int = 1000) -> Dict[str, Dict[str, Any]]:
+    """Get the status of every task in Redis, keyed by task ID
+    
+    Keys are found with SCAN and their hashes fetched in pipelined batches, so listing
+    N tasks costs about N / batch_size round-trips without blocking Redis on one huge pipeline.
+    """
+    statuses = {}
+    keys = list(redis_client.scan_iter(match="task_status:*", count=500))
+    
+    for start in range(0, len(keys), batch_size):
+        pipe = redis_client.pipeline(transaction=False)
+        for key in keys[start:start + batch_size]:
+            pipe.hgetall(key)
+        
+        for task_data in pipe.execute():
+            # Keys can expire between SCAN and HGETALL
+            if not task_data:
+                continue
+            status = _decode_task_status(task_data)
+            if 'id' in status:
+                statuses[status['id']] = status
+    
+    return statuses
+
+def _decode_task_status(task_data: Dict[bytes, bytes]) -> Dict[str, Any]:
+    """Decode a raw task_status hash from Redis, consuming task_data
+    
+    The client returns bytes because results are binary; every other field is UTF-8 text.
+    """
+    packed_mp = task_data.pop(b'result_mp', None)
+    packed_json = task_data.pop(b'result', None)
+    result = {key.decode(): value.decode() for key, value in task_data.items()}
+    
+    # Convert specific fields back to appropriate types
+    if 'progress' in result:
+        result['progress'] = int(result['progress'] or 0)
+    if 'error' in result and not result['error']:
+        result['error'] = None
+    
+    if packed_mp:
+        result['result'] = _unpack_result('result_mp', packed_mp)
+    elif packed_json:
+        result['result'] = _unpack_result('result', packed_json)
+    elif packed_json is not None:
+        result['result'] = None
     
     return result
 
@@ -110,75 +443,33 @@ def process_document_task(self, file_path: str, filename: str, task_id: Optional
     actual_task_id = task_id if task_id else self.request.id
     
     tracker = TaskProgressTracker(actual_task_id)
-    loop = None
-    
-    # Store initial task info
-    initial_data = {
-        'id': actual_task_id,
-        'filename': filename,
-        'file_path': file_path,
-        'status': ProcessingStatus.PENDING,
-        'progress': '0',
-        'result': '',
-        'error': ''
-    }
-    redis_client.hset(f"task_status:{actual_task_id}", mapping=initial_data)
     
     try:
-        # Update to processing status
-        tracker.update_progress(5, ProcessingStatus.PROCESSING)
-        
-        # Initialize services
-        pdf_service = PDFService()
-        ai_service = OllamaAIService()
-        
-        tracker.update_progress(10)
-        
-        # Initialize AI service
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        ollama_available = False
-        
-        try:
-            ollama_available = loop.run_until_complete(ai_service.initialize_models())
-            if ollama_available:
-                logger.info("Ollama AI service initialized successfully")
-            else:
-                logger.warning("Ollama not available, continuing with basic processing")
-            tracker.update_progress(20)
-        except Exception as e:
-            logger.warning(f"Ollama AI service initialization failed: {e}")
-            tracker.update_progress(20)
+        # Store initial info and update to processing status in one round-trip
+        tracker._init_and_update(_initial_task_data(actual_task_id, filename, file_path), 5, ProcessingStatus.PROCESSING)
         
-        # Process file based on type
-        file_path_obj = Path(file_path)
-        file_extension = file_path_obj.suffix.lower()
+        # Services are shared across tasks and initialized once per worker
+        pdf_service, ai_service = _get_worker_services()
+        tracker.update_progress(20)
         
         def progress_callback(progress: int):
-            # Map processing progress to 20-95% range
+            # Map processing progress to 20-95% range; called on the event loop, so write asynchronously
             mapped_progress = 20 + int((progress / 100) * 75)
-            tracker.update_progress(mapped_progress)
+            tracker.queue_progress(mapped_progress)
         
-        if file_extension == '.pdf':
-            result = loop.run_until_complete(
-                pdf_service.process_pdf_with_ai(
-                    file_path_obj,
-                    actual_task_id,
-                    ai_service if ollama_available else None,
-                    progress_callback=progress_callback
-                )
-            )
-        elif file_extension in ['.png', '.jpg', '.jpeg']:
-            result = loop.run_until_complete(
-                pdf_service.process_image_with_ai(
-                    file_path_obj,
+        async def process_with_progress():
+            try:
+                # Dispatches on the file extension; raises ValueError for unsupported types
+                return await pdf_service.process_file_with_ai(
+                    Path(file_path),
                     actual_task_id,
-                    ai_service if ollama_available else None,
+                    ai_service,
                     progress_callback=progress_callback
                 )
-            )
-        else:
-            raise ValueError(f"Unsupported file type: {file_extension}")
+            finally:
+                await tracker.flush()
+        
+        result = _run_in_worker_loop(process_with_progress())
         
         # Check for errors in result
         if 'error' in result:
@@ -194,25 +485,28 @@ def process_document_task(self, file_path: str, filename: str, task_id: Optional
         logger.error(f"Task {actual_task_id} failed: {error_msg}")
         tracker.update_progress(100, ProcessingStatus.ERROR, error=error_msg)
         raise self.retry(exc=e, countdown=60, max_retries=3)
-    
-    finally:
-        if loop is not None:
-            loop.close()
 
 @celery_app.task(name="cleanup_old_tasks")
 def cleanup_old_tasks():
     """Clean up old task results from Redis"""
     try:
-        # Find all task keys older than 24 hours
-        keys = redis_client.keys("task_status:*")
+        # SCAN instead of KEYS so other clients are not blocked while the keyspace is walked
+        keys = list(redis_client.scan_iter(match="task_status:*", count=500))
         cleaned_count = 0
         
-        for key in keys:
-            ttl = redis_client.ttl(key)
-            # If TTL is less than 1 hour remaining (out of 24 hour total), clean it up
-            if ttl < 3600:
-                redis_client.delete(key)
-                cleaned_count += 1
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            pipe = redis_client.pipeline(transaction=False)
+            for key in chunk:
+                pipe.ttl(key)
+            ttls = pipe.execute()
+            
+            # Keys without an expiry (-1) or about to expire (under 1 hour) are cleaned up;
+            # -2 means the key is already gone
+            to_delete = [key for key, ttl in zip(chunk, ttls) if ttl != -2 and ttl < 3600]
+            if to_delete:
+                # UNLINK frees the hashes in the background instead of on Redis's main thread
+                cleaned_count += redis_client.unlink(*to_delete)
         
         logger.info(f"Cleaned up {cleaned_count} old task records")
         return {"cleaned_count": cleaned_count}
@@ -1,7 +1,8 @@
 import asyncio
 import logging
 import uuid
-from typing import Dict, Any, Optional
+from dataclasses import dataclass, fields
+from typing import Dict, Any, AsyncIterator, List, Optional, Tuple
 from pathlib import Path
 from app.services import PDFService
 from app.services.ollama_ai_service import OllamaAIService
@@ -9,11 +10,29 @@ from app.models.schemas import ProcessingStatus
 
 logger = logging.getLogger(__name__)
 
+@dataclass(slots=True)
+class Task:
+    """State of an in-memory document processing task"""
+    id: str
+    filename: str
+    file_path: Path
+    created_at: float
+    status: str = ProcessingStatus.PENDING
+    progress: int = 0
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Shallow dict of the task's fields for API responses"""
+        return {field.name: getattr(self, field.name) for field in _TASK_FIELDS}
+
+_TASK_FIELDS = fields(Task)
+
 class TaskQueue:
     """Simple in-memory task queue for document processing"""
     
     def __init__(self):
-        self.tasks: Dict[str, Dict[str, Any]] = {}
+        self.tasks: Dict[str, Task] = {}
         self.pdf_service = PDFService()
         self.ai_service = OllamaAIService()
         self._ai_initialized = False
@@ -22,16 +41,12 @@ class TaskQueue:
         """Submit a new document processing task"""
         task_id = str(uuid.uuid4())
         
-        self.tasks[task_id] = {
-            'id': task_id,
-            'filename': filename,
-            'file_path': file_path,
-            'status': ProcessingStatus.PENDING,
-            'progress': 0,
-            'result': None,
-            'error': None,
-            'created_at': asyncio.get_event_loop().time()
-        }
+        self.tasks[task_id] = Task(
+            id=task_id,
+            filename=filename,
+            file_path=file_path,
+            created_at=asyncio.get_event_loop().time()
+        )
         
         # Start processing in background
         asyncio.create_task(self._process_document(task_id))
@@ -39,13 +54,33 @@ class TaskQueue:
         logger.info(f"Task {task_id} submitted for file: {filename}")
         return task_id
     
+    async def submit_tasks(self, files: List[Tuple[Path, str]]) -> List[str]:
+        """Submit several document processing tasks"""
+        return [await self.submit_task(file_path, filename) for file_path, filename in files]
+    
     def get_task_status(self, task_id: str) -> Optional[Dict[str, Any]]:
         """Get the status of a task"""
-        return self.tasks.get(task_id)
+        task = self.tasks.get(task_id)
+        return task.to_dict() if task else None
+    
+    async def watch_task_status(self, task_id: str, interval: float = 0.5) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        """Yield a task's status on every change until it finishes; None is a keep-alive tick"""
+        last_seen = None
+        while True:
+            task = self.tasks.get(task_id)
+            seen = (task.status, task.progress) if task else None
+            if seen != last_seen:
+                last_seen = seen
+                yield task.to_dict() if task else None
+                if task and task.status in (ProcessingStatus.COMPLETED, ProcessingStatus.ERROR):
+                    return
+            else:
+                yield None
+            await asyncio.sleep(interval)
     
     def get_all_tasks(self) -> Dict[str, Dict[str, Any]]:
         """Get all tasks"""
-        return self.tasks
+        return {task_id: task.to_dict() for task_id, task in self.tasks.items()}
     
     async def _process_document(self, task_id: str):
         """Process a document in the background with real-time progress"""
@@ -56,15 +91,14 @@ class TaskQueue:
             
         def update_progress(progress: int):
             """Helper to update task progress"""
-            if task_id in self.tasks:
-                self.tasks[task_id]['progress'] = min(progress, 100)
-                logger.debug(f"Task {task_id} progress: {progress}%")
+            task.progress = min(progress, 100)
+            logger.debug(f"Task {task_id} progress: {progress}%")
             
         try:
-            file_path = Path(task['file_path'])
+            file_path = Path(task.file_path)
             
             # Update status to processing
-            task['status'] = ProcessingStatus.PROCESSING
+            task.status = ProcessingStatus.PROCESSING
             update_progress(5)
             
             # Initialize AI service if not done yet (5-15%)
@@ -84,35 +118,23 @@ class TaskQueue:
             else:
                 update_progress(15)
             
-            # Determine file type and process accordingly (15-95%)
-            file_extension = file_path.suffix.lower()
-            
-            if file_extension == '.pdf':
-                result = await self.pdf_service.process_pdf_with_ai(
-                    file_path, 
-                    task_id, 
-                    self.ai_service if self._ai_initialized else None,
-                    progress_callback=update_progress
-                )
-            elif file_extension in ['.png', '.jpg', '.jpeg']:
-                result = await self.pdf_service.process_image_with_ai(
-                    file_path, 
-                    task_id, 
-                    self.ai_service if self._ai_initialized else None,
-                    progress_callback=update_progress
-                )
-            else:
-                raise ValueError(f"Unsupported file type: {file_extension}")
+            # Process according to file type (15-95%)
+            result = await self.pdf_service.process_file_with_ai(
+                file_path, 
+                task_id, 
+                self.ai_service if self._ai_initialized else None,
+                progress_callback=update_progress
+            )
             
             update_progress(95)
             
             # Update task with results (95-100%)
             if 'error' in result:
-                task['status'] = ProcessingStatus.ERROR
-                task['error'] = result['error']
+                task.status = ProcessingStatus.ERROR
+                task.error = result['error']
             else:
-                task['status'] = ProcessingStatus.COMPLETED
-                task['result'] = result
+                task.status = ProcessingStatus.COMPLETED
+                task.result = result
             
             update_progress(100)
             
@@ -120,8 +142,8 @@ class TaskQueue:
             
         except Exception as e:
             logger.error(f"Task {task_id} failed: {str(e)}")
-            task['status'] = ProcessingStatus.ERROR
-            task['error'] = str(e)
+            task.status = ProcessingStatus.ERROR
+            task.error = str(e)
             update_progress(100)
 
 # Global task queue instance
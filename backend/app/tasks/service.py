@@ -5,7 +5,7 @@ Provides interface to switch between in-memory and Celery task queues
 
 import os
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, AsyncIterator, List, Optional, Tuple
 from pathlib import Path
 
 from app.models.schemas import ProcessingStatus
@@ -41,14 +41,33 @@ class TaskService:
         """Submit a new document processing task"""
         return await self._queue.submit_task(file_path, filename)
     
+    async def submit_tasks(self, files: List[Tuple[Path, str]]) -> List[str]:
+        """Submit several (file_path, filename) processing tasks at once"""
+        return await self._queue.submit_tasks(files)
+    
     def get_task_status(self, task_id: str) -> Optional[Dict[str, Any]]:
         """Get the status of a task"""
         return self._queue.get_task_status(task_id)
     
+    def watch_task_status(self, task_id: str) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        """Yield a task's status on every change until it finishes; None is a keep-alive tick"""
+        return self._queue.watch_task_status(task_id)
+    
     def get_all_tasks(self) -> Dict[str, Dict[str, Any]]:
         """Get all tasks (limited with Celery)"""
         return self._queue.get_all_tasks()
     
+    def get_cached_download(self, task_id: str, format: str) -> Optional[bytes]:
+        """Get a previously rendered download (if the queue caches them)"""
+        if hasattr(self._queue, 'get_cached_download'):
+            return self._queue.get_cached_download(task_id, format)
+        return None
+    
+    def cache_download(self, task_id: str, format: str, content: bytes):
+        """Cache a rendered download (if the queue supports it)"""
+        if hasattr(self._queue, 'cache_download'):
+            self._queue.cache_download(task_id, format, content)
+    
     def cancel_task(self, task_id: str) -> bool:
         """Cancel a running task (if supported)"""
         if hasattr(self._queue, 'cancel_task'):
@@ -1,4 +1,5 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException, Query
+from fastapi import FastAPI, File, UploadFile, HTTPException, Query, Response
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse, StreamingResponse
 from pathlib import Path
@@ -6,8 +7,8 @@ import shutil
 import uuid
 import logging
 import asyncio
-import io
-from typing import Dict, Any, Optional
+import json
+from typing import Dict, Any, List, Optional
 
 # Production imports - No fallbacks allowed
 from app.models.schemas import DocumentProcessingResponse, ProcessingStatus
@@ -37,6 +38,28 @@ app.add_middleware(
 UPLOAD_DIR = Path("uploads")
 UPLOAD_DIR.mkdir(exist_ok=True)
 
+# Copy uploads in 1 MiB chunks rather than shutil's 64 KiB default
+UPLOAD_CHUNK_SIZE = 1 << 20
+
+def _save_upload(source, upload_path: Path):
+    """Write an uploaded file to disk"""
+    with open(upload_path, "wb") as buffer:
+        shutil.copyfileobj(source, buffer, UPLOAD_CHUNK_SIZE)
+
+ALLOWED_EXTENSIONS = frozenset({'.pdf', '.png', '.jpg', '.jpeg'})
+
+def _upload_path_for(file: UploadFile) -> Path:
+    """Validate an upload's file type and return a unique path to save it to"""
+    file_extension = Path(file.filename or '').suffix.lower()
+    if file_extension not in ALLOWED_EXTENSIONS:
+        raise HTTPException(
+            status_code=400, 
+            detail="Unsupported file type. Please upload PDF, PNG, JPG, or JPEG files."
+        )
+    
+    # Create unique filename
+    return UPLOAD_DIR / f"{uuid.uuid4()}{file_extension}"
+
 @app.get("/")
 async def root():
     """Root endpoint"""
@@ -54,20 +77,10 @@ async def upload_document(file: UploadFile = File(...)):
     """
     try:
         # Validate file type
-        if not file.filename or not file.filename.lower().endswith(('.pdf', '.png', '.jpg', '.jpeg')):
-            raise HTTPException(
-                status_code=400, 
-                detail="Unsupported file type. Please upload PDF, PNG, JPG, or JPEG files."
-            )
-        
-        # Create unique filename
-        file_extension = Path(file.filename).suffix
-        unique_filename = f"{uuid.uuid4()}{file_extension}"
-        upload_path = UPLOAD_DIR / unique_filename
+        upload_path = _upload_path_for(file)
         
-        # Save uploaded file
-        with open(upload_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        # Save uploaded file off the event loop
+        await asyncio.to_thread(_save_upload, file.file, upload_path)
         
         logger.info(f"File uploaded: {upload_path}")
         
@@ -87,8 +100,54 @@ async def upload_document(file: UploadFile = File(...)):
         raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
 
 
+@app.post("/api/upload/batch")
+async def upload_batch(files: List[UploadFile] = File(...)):
+    """
+    Upload several documents in one request and submit them for processing together
+    """
+    try:
+        # Validate every file before saving any of them
+        upload_paths = [_upload_path_for(file) for file in files]
+        
+        await asyncio.gather(*(
+            asyncio.to_thread(_save_upload, file.file, upload_path)
+            for file, upload_path in zip(files, upload_paths)
+        ))
+        logger.info(f"Batch of {len(files)} files uploaded")
+        
+        job_ids = await task_service.submit_tasks(
+            [(upload_path, file.filename) for file, upload_path in zip(files, upload_paths)]
+        )
+        return {
+            "jobs": [
+                {"job_id": job_id, "status": ProcessingStatus.PENDING, "filename": file.filename}
+                for job_id, file in zip(job_ids, files)
+            ],
+            "message": f"{len(files)} documents uploaded successfully. AI processing started."
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Batch upload error: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Batch upload failed: {str(e)}")
+
+
+def _status_response(job_id: str, task_status: Dict[str, Any]) -> Dict[str, Any]:
+    """Shape a task status for the status endpoints"""
+    return {
+        "job_id": job_id,
+        "status": task_status['status'],
+        "progress": task_status['progress'],
+        "filename": task_status.get('filename'),
+        "message": f"Processing {task_status['progress']}% complete",
+        "result": task_status.get('result'),
+        "error": task_status.get('error')
+    }
+
+
 @app.get("/api/status/{job_id}")
-async def get_processing_status(job_id: str):
+async def get_processing_status(job_id: str, response: Response):
     """Get AI processing status for a job"""
     try:
         task_status = task_service.get_task_status(job_id)
@@ -96,15 +155,9 @@ async def get_processing_status(job_id: str):
         if not task_status:
             raise HTTPException(status_code=404, detail="Job not found")
         
-        return {
-            "job_id": job_id,
-            "status": task_status['status'],
-            "progress": task_status['progress'],
-            "filename": task_status['filename'],
-            "message": f"Processing {task_status['progress']}% complete",
-            "result": task_status.get('result'),
-            "error": task_status.get('error')
-        }
+        # Let clients and proxies reuse a status for a second; /stream pushes changes instead
+        response.headers["Cache-Control"] = "max-age=1"
+        return _status_response(job_id, task_status)
         
     except HTTPException:
         raise
@@ -113,6 +166,30 @@ async def get_processing_status(job_id: str):
         raise HTTPException(status_code=500, detail=f"Status check failed: {str(e)}")
 
 
+@app.get("/api/status/{job_id}/stream")
+async def stream_processing_status(job_id: str):
+    """Stream AI processing status for a job as server-sent events, one per change"""
+    if not task_service.get_task_status(job_id):
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    async def events():
+        try:
+            async for task_status in task_service.watch_task_status(job_id):
+                if task_status is None:
+                    yield ": keep-alive\n\n"
+                    continue
+                payload = jsonable_encoder(_status_response(job_id, task_status))
+                yield f"data: {json.dumps(payload)}\n\n"
+        except Exception as e:
+            logger.error(f"Status stream error for {job_id}: {str(e)}")
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"}
+    )
+
+
 @app.get("/api/results/{job_id}")
 async def get_document_results(job_id: str):
     """Get the detailed AI analysis results of a processed document"""
@@ -136,6 +213,11 @@ async def get_document_results(job_id: str):
         logger.error(f"Results retrieval error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Results retrieval failed: {str(e)}")
 
+DOWNLOAD_MEDIA_TYPES = {
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "txt": "text/plain; charset=utf-8"
+}
+
 @app.get("/api/download/{job_id}")
 async def download_processed_document(job_id: str, format: str = Query("docx", regex="^(docx|txt)$")):
     """
@@ -157,36 +239,37 @@ async def download_processed_document(job_id: str, format: str = Query("docx", r
         if not result:
             raise HTTPException(status_code=404, detail="No processing results found")
         
+        filename = result.get('filename', 'document')
+        # Results do not change once a job completes, so renders are cached
+        content = await asyncio.to_thread(task_service.get_cached_download, job_id, format)
+        
         # Generate document based on format
-        if format == "docx":
-            try:
-                from app.services.document_service import DocumentGenerator
-                doc_buffer = DocumentGenerator.create_docx_from_results(result)
-                
-                return StreamingResponse(
-                    io.BytesIO(doc_buffer.read()),
-                    media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-                    headers={"Content-Disposition": f"attachment; filename={result.get('filename', 'document')}_processed.docx"}
-                )
-            except ImportError:
-                # Fallback if python-docx is not available
-                from app.services.document_service import DocumentGenerator
-                text_content = DocumentGenerator.create_text_from_results(result)
-                return StreamingResponse(
-                    io.BytesIO(text_content.encode('utf-8')),
-                    media_type="text/plain",
-                    headers={"Content-Disposition": f"attachment; filename={result.get('filename', 'document')}_processed.txt"}
-                )
-        
-        elif format == "txt":
+        if content is None:
             from app.services.document_service import DocumentGenerator
-            text_content = DocumentGenerator.create_text_from_results(result)
+            if format == "docx":
+                try:
+                    doc_buffer = await DocumentGenerator.create_docx_async(result)
+                    content = doc_buffer.getvalue()
+                except ImportError:
+                    # Fallback if python-docx is not available
+                    text_content = await DocumentGenerator.create_text_async(result)
+                    return Response(
+                        content=text_content,
+                        media_type="text/plain",
+                        headers={"Content-Disposition": f"attachment; filename={filename}_processed.txt"}
+                    )
+            else:
+                text_content = await DocumentGenerator.create_text_async(result)
+                content = text_content.encode('utf-8')
             
-            return StreamingResponse(
-                io.BytesIO(text_content.encode('utf-8')),
-                media_type="text/plain",
-                headers={"Content-Disposition": f"attachment; filename={result.get('filename', 'document')}_processed.txt"}
-            )
+            await asyncio.to_thread(task_service.cache_download, job_id, format, content)
+        
+        # The document is in memory; send it as one body with a Content-Length
+        return Response(
+            content=content,
+            media_type=DOWNLOAD_MEDIA_TYPES[format],
+            headers={"Content-Disposition": f"attachment; filename={filename}_processed.{format}"}
+        )
         
     except HTTPException:
         raise
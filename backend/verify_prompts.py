@@ -5,19 +5,21 @@ Quick verification that the prompt system is working correctly
 
 import sys
 import os
-sys.path.append(os.path.join(os.path.dirname(__file__), 'app'))
+_APP_DIR = os.path.join(os.path.dirname(__file__), 'app')
+if _APP_DIR not in sys.path:
+    sys.path.append(_APP_DIR)
 
 def verify_prompt_system():
     """Verify the prompt system is working"""
-    print("🔍 Verifying IntelliDoc AI Prompt System")
-    print("=" * 50)
+    # Collected and written once at the end rather than printed line by line
+    msgs = ["🔍 Verifying IntelliDoc AI Prompt System", "=" * 50]
     
     try:
         # Test imports
         from app.services.prompts import DocumentPrompts, SpecializedPrompts
         from app.services.advanced_prompts import AdvancedPromptManager, PromptStrategy
-        from app.services.prompt_config import MODEL_CONFIGS, CUSTOM_PROMPTS
-        print("✅ All imports successful")
+        from app.services.prompt_config import ModelConfig, get_config
+        msgs.append("✅ All imports successful")
         
         # Test basic functionality
         prompts = DocumentPrompts()
@@ -29,36 +31,39 @@ def verify_prompt_system():
         sentiment = prompts.get_sentiment_prompt(test_text)
         summary = prompts.get_summarization_prompt(test_text)
         
-        print("✅ Basic prompts generated successfully")
+        msgs.append("✅ Basic prompts generated successfully")
         
         # Test advanced features
-        manager = AdvancedPromptManager(strategy=PromptStrategy.ACCURACY_FOCUSED)
+        manager = AdvancedPromptManager.for_strategy(PromptStrategy.ACCURACY_FOCUSED)
         optimized = manager.get_optimized_prompt("classification", test_text)
-        print("✅ Advanced prompt optimization working")
+        msgs.append("✅ Advanced prompt optimization working")
         
         # Test specialized prompts
         invoice_prompt = SpecializedPrompts.get_invoice_analysis_prompt(test_text)
-        print("✅ Specialized prompts working")
+        msgs.append("✅ Specialized prompts working")
         
-        # Test configuration
-        config = MODEL_CONFIGS.get("classification")
-        if config:
-            print("✅ Configuration system working")
+        # Test configuration, read through the accessor so tables swapped in by import_config are seen
+        config = get_config("classification", "model")
+        if isinstance(config, ModelConfig):
+            msgs.append("✅ Configuration system working")
         
         # Verify integration
         try:
             from app.services.ollama_ai_service import OllamaAIService
-            print("✅ Integration with AI service confirmed")
+            msgs.append("✅ Integration with AI service confirmed")
         except ImportError as e:
-            print(f"⚠️ AI service integration: {e}")
+            msgs.append(f"⚠️ AI service integration: {e}")
         
-        print("\n🎉 Prompt system verification completed successfully!")
-        print("🎯 Ready for production use!")
+        msgs.append("\n🎉 Prompt system verification completed successfully!")
+        msgs.append("🎯 Ready for production use!")
         return True
         
     except Exception as e:
-        print(f"❌ Verification failed: {e}")
+        msgs.append(f"❌ Verification failed: {e}")
         return False
+    
+    finally:
+        sys.stdout.write("\n".join(msgs) + "\n")
 
 if __name__ == "__main__":
     success = verify_prompt_system()